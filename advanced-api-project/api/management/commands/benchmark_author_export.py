@@ -0,0 +1,62 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Author, Book
+from api.renderers import StreamingJSONRenderer
+from api.serializers import AuthorSerializer
+
+
+def measure(export):
+    """Run ``export`` and return (seconds, peak traced bytes, output bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = export()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+class Command(BaseCommand):
+    help = 'Compare memory use of rendering all authors at once with the streamed export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=20000, help='Number of authors to create')
+        parser.add_argument('--books', type=int, default=3, help='Books per author')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Authors per streamed chunk')
+
+    def handle(self, *args, **options):
+        # The data is created inside a transaction that is rolled back at the end
+        with transaction.atomic():
+            authors = Author.objects.bulk_create(
+                Author(name=f"Author {i}") for i in range(options['authors'])
+            )
+            Book.objects.bulk_create(
+                (Book(title=f"Book {author.pk}.{j}", publication_year=1900 + j, author=author)
+                 for author in authors for j in range(options['books'])),
+                batch_size=5000,
+            )
+            del authors
+
+            queryset = AuthorSerializer.setup_eager_loading(Author.objects.order_by('pk'))
+
+            def render_all():
+                return len(JSONRenderer().render(AuthorSerializer(queryset.all(), many=True).data))
+
+            def stream():
+                serializer = AuthorSerializer()
+                items = (serializer.to_representation(author)
+                         for author in queryset.iterator(chunk_size=options['chunk_size']))
+                return sum(len(chunk) for chunk in StreamingJSONRenderer().stream(items))
+
+            for label, export in [('list', render_all), ('stream', stream)]:
+                elapsed, peak, size = measure(export)
+                self.stdout.write(
+                    f'{label:<8} {elapsed:6.2f}s  peak {peak / 2**20:8.1f} MiB  output {size / 2**20:6.1f} MiB'
+                )
+
+            transaction.set_rollback(True)
@@ -3,6 +3,7 @@ from django.db import models
 class Author(models.Model): 
     """Author details"""
     name = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -12,6 +13,18 @@ class Book(models.Model):
     title = models.CharField(max_length=100)
     publication_year = models.IntegerField()
     author = models.ForeignKey(Author, related_name="books", on_delete=models.CASCADE) # one-to-many relationship between an author and books
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # One index per filter/ordering supported by the book list; the id
+        # suffix matches the tie-breaker used by the cursor pagination
+        indexes = [
+            models.Index(fields=['publication_year', 'id'], name='book_year_idx'),
+            models.Index(fields=['title', 'id'], name='book_title_idx'),
+            models.Index(fields=['author', 'publication_year', 'id'], name='book_author_year_idx'),
+            # Covers the count/max(updated_at) behind the list ETag
+            models.Index(fields=['updated_at'], name='book_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BookCursorPagination(CursorPagination):
+    """
+    Cursor pagination for books, newest first by default.
+
+    Every supported ordering is backed by a ``(field, id)`` index, and the
+    primary key is appended as a tie-breaker so pages stay stable when
+    many books share a title or year.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-publication_year', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
@@ -0,0 +1,24 @@
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a lazy iterator of rows.
+
+    The request body is read line by line as the rows are consumed. Lines
+    that are not valid JSON are passed on as text, so they are reported as
+    invalid rows instead of failing the whole request.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return (self.parse_line(line) for line in stream if line.strip())
+
+    @staticmethod
+    def parse_line(line):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return line.decode('utf-8', errors='replace').strip()
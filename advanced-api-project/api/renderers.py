@@ -0,0 +1,25 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """
+    Renders an iterable of serialized objects as a JSON array, piece by piece.
+
+    ``stream()`` is a generator suitable for a ``StreamingHttpResponse``:
+    objects are encoded one at a time and flushed in chunks of roughly
+    ``buffer_size`` bytes, so the whole array is never held in memory.
+    """
+    buffer_size = 64 * 1024
+
+    def stream(self, items, renderer_context=None):
+        buffer = bytearray(b'[')
+        separator = b''
+        for item in items:
+            buffer += separator
+            buffer += super().render(item, renderer_context=renderer_context)
+            separator = b','
+            if len(buffer) >= self.buffer_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b']'
+        yield bytes(buffer)
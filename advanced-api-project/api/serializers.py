@@ -1,19 +1,111 @@
 from rest_framework import serializers
 from datetime import datetime
+from django.utils import timezone
 
+from .mixins import SparseFieldsetSerializerMixin
 from .models import Author, Book
 
-class BookSerializer(serializers.ModelSerializer):
-    """Serializes the book model"""
+class AuthorPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Author by id, looked up in the bulk serializer's per-batch cache when there is one"""
+
+    def to_internal_value(self, data):
+        authors = self.context.get('authors')
+        if authors is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return authors[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+class BookListSerializer(serializers.ListSerializer):
+    """
+    Validates and saves a batch of books.
+
+    Unlike the default ListSerializer, invalid rows do not fail the whole
+    batch: they are collected in ``row_errors`` as ``(index, errors)`` and
+    only the valid rows end up in ``validated_data``. Authors referenced by
+    the batch are loaded in one query and the current year is computed once.
+
+    For updates, ``instance`` maps book ids to books and every row must
+    carry the ``id`` of the book it changes.
+    """
+
+    def run_validation(self, data=serializers.empty):
+        self.row_errors = []
+        if isinstance(data, list):
+            author_ids = set()
+            for row in data:
+                try:
+                    author_ids.add(int(row['author']))
+                except (KeyError, TypeError, ValueError):
+                    pass
+            self.context.update(
+                authors=Author.objects.in_bulk(author_ids),
+                current_year=datetime.now().year,
+            )
+        return super().run_validation(data)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        validated = []
+        for index, row in enumerate(data):
+            try:
+                validated.append(self.run_child_validation(row))
+            except serializers.ValidationError as exc:
+                self.row_errors.append((index, exc.detail))
+        return validated
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        try:
+            book = self.instance[int(data['id'])]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({'id': ['A valid id of an existing book is required.']})
+        self.child.instance = book
+        validated = super().run_child_validation(data)
+        validated['id'] = book.pk
+        return validated
+
+    def create(self, validated_data):
+        return Book.objects.bulk_create([Book(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        # bulk_update() skips auto_now, so updated_at is set here
+        now = timezone.now()
+        books, fields = [], {'updated_at'}
+        for attrs in validated_data:
+            book = instance[attrs.pop('id')]
+            for field, value in attrs.items():
+                setattr(book, field, value)
+            book.updated_at = now
+            fields.update(attrs)
+            books.append(book)
+        Book.objects.bulk_update(books, fields)
+        return books
+
+class BookSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Serializes the book model; GET requests can pick fields with ?fields=/?exclude="""
+    author = AuthorPrimaryKeyField(queryset=Author.objects.all())
+
     class Meta:
         model = Book
         fields = '__all__'
+        list_serializer_class = BookListSerializer
     
     def validate_publication_year(self, value):
         """validate the publication year is not in the future"""
-        current_year = datetime.now().year
+        # Bulk validation computes the year once per batch
+        current_year = self.context.get('current_year') or datetime.now().year
         if value > current_year:
-            raise serializers.ValidationError("Publication year must be less than %d", current_year)
+            raise serializers.ValidationError(f"Publication year must be less than {current_year}")
         elif len(str(value)) > 4:
             raise serializers.ValidationError("Invalid year")
         return value
@@ -26,3 +118,8 @@ class AuthorSerializer(serializers.ModelSerializer):
         model = Author
         fields = ['name', 'books']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load the nested books in one extra query instead of one per author"""
+        return queryset.prefetch_related('books')
+
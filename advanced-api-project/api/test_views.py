@@ -1,8 +1,18 @@
+import json
+from datetime import timedelta
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APITestCase, APIClient
-from rest_framework import status
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from rest_framework import serializers, status
 
 from .models import Book, Author
+from .serializers import BookSerializer
+from .views import AuthorExportView, BookBulkView, ListView
 from accounts.models import User
 
 class BookCRUDTestCase(APITestCase):
@@ -30,7 +40,11 @@ class BookCRUDTestCase(APITestCase):
         url = reverse('book-detail', kwargs={'pk': self.book.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.json()[0]['title'], self.book.title)
+        self.assertEqual(response.json()['title'], self.book.title)
+
+    def test_retrieve_missing_book(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.pk + 1})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
 
     # CREATE - Test creating a new book
     def test_create_book_unauthenticated(self):
@@ -104,21 +118,374 @@ class BookCRUDTestCase(APITestCase):
     # FILTERING - Test filtering functionality
     def test_filter_books_by_author(self):
         url = reverse('get-all-books')
+        Book.objects.create(title="Emma", publication_year=1815, author=Author.objects.create(name="Other"))
         response = self.client.get(url, {'author': self.author.id}) # type: ignore
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_filter_books_by_year(self):
+        Book.objects.create(title="Emma", publication_year=1815, author=self.author)
+        url = reverse('get-all-books')
+        response = self.client.get(url, {'publication_year': 1815})
+        self.assertEqual([book['title'] for book in response.json()['results']], ["Emma"])
 
     def test_search_books(self):
         url = reverse('get-all-books')
         response = self.client.get(url, {'search': 'Pride'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.json()), 1)
+        self.assertGreaterEqual(len(response.json()['results']), 1)
 
     def test_order_books(self):
         Book.objects.create(title="Emma", publication_year=1815, author=self.author)
         url = reverse('get-all-books')
         response = self.client.get(url, {'ordering': 'publication_year'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        books = response.json()
+        books = response.json()['results']
         self.assertEqual(books[0]['publication_year'], 1813)
 
+
+class BookPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('get-all-books')
+        author = Author.objects.create(name="Jane Austen")
+        # Several books per year and title, so pages split ties
+        Book.objects.bulk_create(
+            Book(title=f"Book {i % 7}", publication_year=1900 + i % 5, author=author)
+            for i in range(40)
+        )
+
+    def walk(self, params):
+        ids = []
+        response = self.client.get(self.url, {**params, 'page_size': 6})
+        while True:
+            data = response.json()
+            ids.extend(book['id'] for book in data['results'])
+            if not data['next']:
+                return ids
+            response = self.client.get(data['next'])
+
+    def test_default_ordering_newest_first(self):
+        books = self.client.get(self.url).json()['results']
+        self.assertEqual(books[0]['publication_year'], 1904)
+        self.assertEqual(len(books), 40)
+
+    def test_cursor_walk_returns_every_book_once(self):
+        for ordering in ['', 'title', '-title', 'publication_year', '-publication_year']:
+            with self.subTest(ordering=ordering):
+                ids = self.walk({'ordering': ordering} if ordering else {})
+                self.assertEqual(sorted(ids), sorted(Book.objects.values_list('id', flat=True)))
+
+
+@skipUnless(connection.vendor == 'sqlite', "query plans are checked on SQLite")
+class BookListQueryPlanTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('get-all-books')
+        self.author = Author.objects.create(name="Jane Austen")
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=1900 + i % 50, author=self.author)
+            for i in range(200)
+        )
+
+    def book_query_plan(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The ETag aggregate and the page itself
+        plan = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                if 'FROM "api_book"' in query['sql']:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                    plan.extend(row[-1] for row in cursor.fetchall())
+        return plan
+
+    def test_filters_and_orderings_use_indexes(self):
+        filters = [{}, {'title': "Book 3"}, {'author': self.author.pk}, {'publication_year': 1910}]
+        orderings = [{}, {'ordering': 'title'}, {'ordering': '-title'},
+                     {'ordering': 'publication_year'}, {'ordering': '-publication_year'}]
+        for filter_params in filters:
+            for ordering in orderings:
+                params = {**filter_params, **ordering}
+                with self.subTest(**params):
+                    plan = self.book_query_plan(params)
+                    book_steps = [step for step in plan if 'api_book' in step]
+                    self.assertTrue(book_steps, plan)
+                    for step in book_steps:
+                        self.assertIn('USING', step, plan)
+
+
+
+class AuthorListTestCase(APITestCase):
+    def setUp(self):
+        for i in range(5):
+            author = Author.objects.create(name=f"Author {i}")
+            Book.objects.bulk_create(
+                Book(title=f"Book {i}.{j}", publication_year=1900 + j, author=author)
+                for j in range(3)
+            )
+
+    def test_list_prefetches_books(self):
+        # The ETag aggregate, then authors and their books, however many
+        # authors there are
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('authors'))
+        self.assertEqual(len(response.json()), 5)
+        self.assertEqual(len(response.json()[0]['books']), 3)
+
+    def test_export_streams_same_payload(self):
+        expected = self.client.get(reverse('authors')).json()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('authors-export'))
+            self.assertTrue(response.streaming)
+            content = b''.join(response.streaming_content)
+        self.assertEqual(json.loads(content), expected)
+
+    def test_export_reads_in_chunks(self):
+        with patch.object(AuthorExportView, 'chunk_size', 2):
+            # One author query fetched in chunks, and a books query per chunk
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse('authors-export'))
+                authors = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([author['name'] for author in authors], [f"Author {i}" for i in range(5)])
+
+    def test_export_empty(self):
+        Author.objects.all().delete()
+        response = self.client.get(reverse('authors-export'))
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), [])
+
+
+class BookBulkTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('bulk-books')
+        self.user = User.objects.create_user(username="user", email="user@test.com", password="userPass")
+        self.client.force_login(user=self.user)
+        self.author = Author.objects.create(name="Jane Austen")
+
+    def rows(self, count):
+        return [{"title": f"Book {i}", "publication_year": 1800 + i, "author": self.author.pk}
+                for i in range(count)]
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.post(self.url, self.rows(1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_json_array(self):
+        # Session and user, the savepoint pair, then an author lookup and
+        # one INSERT per batch
+        with self.settings(BOOK_BULK_BATCH_SIZE=50), self.assertNumQueries(2 + 2 * 2 + 2):
+            response = self.client.post(self.url, self.rows(100), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json(), {'created': 100, 'errors': []})
+        self.assertEqual(Book.objects.count(), 100)
+
+    def test_batch_size_setting(self):
+        for batch_size, batches in [(30, 4), (100, 1)]:
+            with self.subTest(batch_size=batch_size), self.settings(BOOK_BULK_BATCH_SIZE=batch_size):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.post(self.url, self.rows(100), format='json')
+                inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "api_book"')]
+                self.assertEqual(len(inserts), batches)
+
+        with patch.object(BookBulkView, 'batch_size', 50), CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, self.rows(100), format='json')
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('INSERT INTO "api_book"')]), 2)
+
+    def test_bulk_create_ndjson_reports_bad_rows(self):
+        lines = [json.dumps(row) for row in self.rows(3)]
+        lines[1] = json.dumps({"title": "Future", "publication_year": 9999, "author": self.author.pk})
+        lines.append('{"title": broken')
+        lines.append(json.dumps({"title": "No author", "publication_year": 1900, "author": 424242}))
+        response = self.client.generic('POST', self.url, '\n'.join(lines) + '\n',
+                                       content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual([error['index'] for error in data['errors']], [1, 3, 4])
+        self.assertIn('publication_year', data['errors'][0]['errors'])
+        self.assertIn('author', data['errors'][2]['errors'])
+        self.assertEqual(sorted(Book.objects.values_list('title', flat=True)), ["Book 0", "Book 2"])
+
+    def test_all_rows_invalid(self):
+        response = self.client.post(self.url, [{"title": "Missing fields"}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['created'], 0)
+
+    def test_rejects_non_list(self):
+        response = self.client.post(self.url, self.rows(1)[0], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        books = Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=1800, author=self.author) for i in range(5)
+        )
+        rows = [{"id": book.pk, "publication_year": 1900 + i} for i, book in enumerate(books)]
+        rows.append({"id": 424242, "title": "Unknown"})
+        rows.append({"title": "No id"})
+        response = self.client.patch(self.url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.json()['updated'], 5)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [5, 6])
+        self.assertEqual(list(Book.objects.order_by('pk').values_list('publication_year', flat=True)),
+                         [1900, 1901, 1902, 1903, 1904])
+        self.assertEqual(Book.objects.get(pk=books[0].pk).title, "Book 0")
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('get-all-books')
+        self.author = Author.objects.create(name="Jane Austen")
+        self.book = Book.objects.create(title="Emma", publication_year=1815, author=self.author)
+        Book.objects.create(title="Persuasion", publication_year=1817, author=self.author)
+
+    def test_if_none_match_returns_304_without_serializing(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+
+        with patch.object(BookSerializer, 'to_representation') as to_representation:
+            # Only the aggregate query
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        to_representation.assert_not_called()
+
+    def test_change_invalidates_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.book.title = "Emma."
+        self.book.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.book.delete()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+    def test_no_last_modified(self):
+        # A delete would not move it, so only the ETag is sent
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        Book.objects.filter(pk=self.book.pk).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_per_format(self):
+        for url in (self.url, reverse('book-detail', kwargs={'pk': self.book.pk})):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('Accept', response['Vary'])
+                etag = response['ETag']
+                browsable = self.client.get(url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(browsable.status_code, status.HTTP_200_OK)
+                self.assertNotEqual(browsable['ETag'], etag)
+                response = self.client.get(url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=browsable['ETag'])
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertIn('Accept', response['Vary'])
+
+    def test_detail_etag(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.pk})
+        etag = self.client.get(url)['ETag']
+        with patch.object(BookSerializer, 'to_representation') as to_representation:
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+        # Any edit moves updated_at, even within the same second
+        self.book.title = "Emma."
+        self.book.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['title'], "Emma.")
+
+    def test_filtered_and_searched_lists(self):
+        for params in [{'publication_year': 1815}, {'search': 'Emma'}]:
+            with self.subTest(**params):
+                etag = self.client.get(self.url, params)['ETag']
+                self.assertNotEqual(etag, self.client.get(self.url)['ETag'])
+                response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Books outside the filter do not change its ETag
+        etag = self.client.get(self.url, {'search': 'Emma'})['ETag']
+        Book.objects.create(title="Sanditon", publication_year=1817, author=self.author)
+        response = self.client.get(self.url, {'search': 'Emma'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_author_etag_follows_nested_books(self):
+        url = reverse('authors')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        Book.objects.create(title="Sanditon", publication_year=1817, author=self.author)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_bulk_update_touches_updated_at(self):
+        user = User.objects.create_user(username="user", email="user@test.com", password="userPass")
+        self.client.force_login(user=user)
+        Book.objects.filter(pk=self.book.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        etag = self.client.get(self.url)['ETag']
+        self.client.patch(reverse('bulk-books'), [{"id": self.book.pk, "title": "Emma"}], format='json')
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse('get-all-books')
+        author = Author.objects.create(name="Jane Austen")
+        Book.objects.create(title="Emma", publication_year=1815, author=author)
+
+    def page_query(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['results'], next(q['sql'] for q in queries if 'LIMIT' in q['sql'])
+
+    def test_fields_limits_output_and_columns(self):
+        books, sql = self.page_query({'fields': 'id,title', 'ordering': 'title'})
+        self.assertEqual(list(books[0]), ['id', 'title'])
+        self.assertNotIn('"publication_year"', sql)
+        self.assertNotIn('"author_id"', sql)
+
+    def test_ordering_columns_still_loaded(self):
+        # The cursor position is read from the default ordering column
+        books, sql = self.page_query({'fields': 'title'})
+        self.assertEqual(list(books[0]), ['title'])
+        self.assertIn('"publication_year"', sql)
+
+    def test_exclude(self):
+        books, sql = self.page_query({'exclude': 'updated_at,author'})
+        self.assertEqual(set(books[0]), {'id', 'title', 'publication_year'})
+        self.assertNotIn('"author_id"', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get(self.url, {'fields': 'title,isbn'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'fields': ["Unknown field: isbn"]})
+
+    def test_nested_books_keep_all_fields(self):
+        response = self.client.get(reverse('authors'), {'fields': 'title'})
+        self.assertIn('publication_year', response.json()[0]['books'][0])
+
+    def test_method_field_defers_omitted_columns(self):
+        class LabelledBookSerializer(BookSerializer):
+            label = serializers.SerializerMethodField()
+
+            def get_label(self, book):
+                return f"{book.title} ({book.publication_year})"
+
+        view = ListView.as_view(serializer_class=LabelledBookSerializer)
+        request = APIRequestFactory().get(self.url, {'exclude': 'author'})
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+            response.render()
+        books = response.data['results']
+        self.assertEqual(books[0]['label'], "Emma (1815)")
+        self.assertNotIn('author', books[0])
+        sql = next(q['sql'] for q in queries if 'LIMIT' in q['sql'])
+        self.assertNotIn('"author_id"', sql)
+        self.assertIn('"title"', sql)
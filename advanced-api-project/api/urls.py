@@ -6,7 +6,9 @@ from .views import (
     CreateView,
     UpdateView,
     DeleteView,
-    AuthorListCreateAPIView
+    BookBulkView,
+    AuthorListCreateAPIView,
+    AuthorExportView,
 )
 
 urlpatterns = [
@@ -15,6 +17,8 @@ urlpatterns = [
     path('books/create/', CreateView.as_view(), name='create-book'),
     path('books/update/<int:id>/', UpdateView.as_view(), name='update-book'),
     path('books/delete/<int:pk>/', DeleteView.as_view(), name='delete-book'),
+    path('books/bulk/', BookBulkView.as_view(), name='bulk-books'),
 
-    path('authors/', AuthorListCreateAPIView.as_view(), name='authors')
+    path('authors/', AuthorListCreateAPIView.as_view(), name='authors'),
+    path('authors/export/', AuthorExportView.as_view(), name='authors-export'),
 ]
\ No newline at end of file
@@ -1,5 +1,14 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters import rest_framework
@@ -7,20 +16,52 @@ from rest_framework import filters
 
 from .serializers import BookSerializer, AuthorSerializer
 from .models import Book, Author
+from .mixins import ConditionalGetMixin, SparseFieldsetMixin
+from .pagination import BookCursorPagination
+from .parsers import NDJSONParser
+from .renderers import StreamingJSONRenderer
 
-class AuthorListCreateAPIView(generics.ListCreateAPIView):
+class AuthorListCreateAPIView(ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
+    # Nested books are part of each author's representation
+    conditional_related = ['books']
+
+    def get_queryset(self):
+        return AuthorSerializer.setup_eager_loading(super().get_queryset())
 
-class ListView(generics.ListAPIView):
+class AuthorExportView(APIView):
+    """
+    Export every author with their books as a streamed JSON array.
+    Authors are read in chunks, each with its books prefetched, so memory
+    use stays flat however many authors there are.
+    """
+    chunk_size = 2000
+
+    def get(self, request):
+        queryset = AuthorSerializer.setup_eager_loading(Author.objects.order_by('pk'))
+        # One serializer reused for every author; building its fields is
+        # far more expensive than serializing a row
+        serializer = AuthorSerializer(context={'request': request})
+        authors = (
+            serializer.to_representation(author)
+            for author in queryset.iterator(chunk_size=self.chunk_size)
+        )
+        return StreamingHttpResponse(
+            StreamingJSONRenderer().stream(authors), content_type='application/json'
+        )
+
+class ListView(ConditionalGetMixin, SparseFieldsetMixin, generics.ListAPIView):
     """
     List all books with filtering, searching, and ordering capabilities.
+    Results are cursor-paginated, newest first unless ``ordering`` is given.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    pagination_class = BookCursorPagination
     
-    # Filter backends - enable searching and ordering functionality
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # Filter backends - enable filtering, searching and ordering functionality
+    filter_backends = [rest_framework.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     
     # Fields that support exact match filtering
     filterset_fields = ["title", "author", "publication_year"]
@@ -32,7 +73,7 @@ class ListView(generics.ListAPIView):
     # Fields that support ordering
     ordering_fields = ["title", "publication_year"]
 
-class DetailView(generics.ListAPIView):
+class DetailView(ConditionalGetMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
     """Get detailed info on a book"""
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -51,6 +92,75 @@ class UpdateView(generics.UpdateAPIView):
     lookup_field = "id"
     lookup_url_kwarg = "id"
 
+class BookBulkView(APIView):
+    """
+    Create (POST) or update (PATCH) many books in one request.
+
+    The body is a JSON array or an NDJSON stream of books; updates need the
+    ``id`` of each book and only change the fields given. Rows are validated
+    and written in batches of ``get_batch_size()`` with bulk_create and
+    bulk_update, all in one transaction. Invalid rows are reported by index and do not
+    stop the valid ones from being saved.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+    batch_size = None
+
+    def get_batch_size(self):
+        """Rows per batch: ``batch_size`` if set, else BOOK_BULK_BATCH_SIZE"""
+        if self.batch_size is not None:
+            return self.batch_size
+        return getattr(settings, 'BOOK_BULK_BATCH_SIZE', 1000)
+
+    def post(self, request):
+        return self.save_rows(request, update=False)
+
+    def patch(self, request):
+        return self.save_rows(request, update=True)
+
+    def save_rows(self, request, update):
+        rows = request.data
+        if not isinstance(rows, list) and not hasattr(rows, '__next__'):
+            raise ValidationError({'non_field_errors': ['Expected a list of books.']})
+
+        rows = iter(rows)
+        batch_size = self.get_batch_size()
+        saved, offset, errors = 0, 0, []
+        with transaction.atomic():
+            while batch := list(islice(rows, batch_size)):
+                instance = Book.objects.in_bulk(self.row_ids(batch)) if update else None
+                serializer = BookSerializer(
+                    instance, data=batch, many=True, partial=update,
+                    context={'request': request, 'view': self},
+                )
+                serializer.is_valid()
+                errors.extend({'index': offset + index, 'errors': detail}
+                              for index, detail in serializer.row_errors)
+                if serializer.validated_data:
+                    saved += len(serializer.save())
+                offset += len(batch)
+
+        if not errors:
+            response_status = status.HTTP_200_OK if update else status.HTTP_201_CREATED
+        elif saved:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {'updated' if update else 'created': saved, 'errors': errors},
+            status=response_status,
+        )
+
+    @staticmethod
+    def row_ids(batch):
+        ids = set()
+        for row in batch:
+            try:
+                ids.add(int(row['id']))
+            except (KeyError, TypeError, ValueError):
+                pass
+        return ids
+
 class DeleteView(generics.DestroyAPIView):
     """Delete a book"""
     permission_classes = [IsAuthenticated]
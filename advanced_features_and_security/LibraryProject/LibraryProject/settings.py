@@ -30,6 +30,16 @@ ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'yourdomain.com', 'www.yourdomain.com
 # Custom User Model
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
 
+# ModelBackend with permission sets cached across requests
+AUTHENTICATION_BACKENDS = ['bookshelf.backends.CachedPermissionBackend']
+# Cache keeping users' permission sets between requests (see CACHES). It
+# must be shared by all worker processes, or a revoked permission stays
+# granted on the other workers until the timeout; LocMemCache is refused.
+# Set to None to load permissions on every request instead.
+PERMISSION_CACHE_ALIAS = 'permissions'
+# How long a user's permission set is cached (seconds)
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+
 CSRF_COOKIE_SECURE = True # Ensure CSRF cookie is only sent over HTTPS
 SESSION_COOKIE_SECURE = True # Ensure session cookie is only sent over HTTPS
 SECURE_BROWSER_XSS_FILTER = True # Enable browser XSS filtering
@@ -100,6 +110,30 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-project',
+    },
+    # Permission sets and their version (bookshelf.permission_cache). A file
+    # cache is shared by the processes of one host; use Redis or Memcached
+    # when running on several.
+    'permissions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'permissions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Whole-response cache of the book views (bookshelf.response_cache). Point
+# the alias at a FileBasedCache to share entries between worker processes.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -138,6 +172,16 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Content-hashed media (profile photos and thumbnails) never change. Used by the
+# DEBUG-only media view; the web server sets the same header in production
+# (deploy/nginx-media.conf)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Stream uploads to a temporary file on disk instead of holding them in memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Square profile photo thumbnails rendered by the process_profile_photos command
+PROFILE_THUMBNAIL_SIZES = (64, 128, 512)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -14,11 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+
+from bookshelf.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('relationship_app/', include('relationship_app.urls')),
     path('bookshelf/', include('bookshelf.urls')),
 ]
+
+if settings.DEBUG:
+    # Development only; in production the web server serves media, see deploy/nginx-media.conf
+    urlpatterns += [
+        re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve_media, name='media'),
+    ]
@@ -0,0 +1,43 @@
+"""
+Authentication backend caching permission sets across requests.
+
+ModelBackend only caches a user's permissions on the user instance, so
+every request loads them again (one query for direct permissions and one
+for group permissions). Here the set is also kept in the shared
+permission cache, under the user id and the permissions version from
+``permission_cache``. Without one it behaves like ModelBackend.
+
+Users are loaded together with their UserProfile, so role checks need no
+query of their own.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .permission_cache import PERMISSION_CACHE_TIMEOUT, get_permission_cache, permissions_cache_key
+
+
+UserModel = get_user_model()
+
+
+class CachedPermissionBackend(ModelBackend):
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('userprofile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        cache = get_permission_cache()
+        if cache is None:
+            return super().get_all_permissions(user_obj, obj)
+        if not hasattr(user_obj, '_perm_cache'):
+            key = permissions_cache_key(user_obj)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
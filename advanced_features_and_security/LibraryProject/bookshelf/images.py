@@ -0,0 +1,104 @@
+"""
+Profile photo variants.
+
+Originals and thumbnails are stored under names derived from their content,
+so a stored file never changes and can be served with a far-future
+Cache-Control header. Files are copied and hashed in chunks rather than read
+into memory whole.
+
+Apart from its docstring this module is identical to social_media_api's
+``accounts.images``: the projects are deployed separately and share no
+package, so a change here has to be made there as well.
+"""
+import hashlib
+import posixpath
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+THUMBNAIL_SIZES = getattr(settings, 'PROFILE_THUMBNAIL_SIZES', (64, 128, 512))
+# Output format name -> (Pillow format, file extension, save options)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+CHUNK_SIZE = 64 * 1024
+
+# Matches the names produced below: <16 hex digits>[_<size>].<ext>
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{16}(_\d+)?\.\w+$')
+
+
+def file_digest(f):
+    """sha256 hex digest of a storage file, read in chunks"""
+    digest = hashlib.sha256()
+    f.seek(0)
+    for chunk in f.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def _save_once(name, content, storage):
+    # Same name means same content, so an existing file can be reused as is
+    if not storage.exists(name):
+        storage.save(name, content)
+    return name
+
+
+def store_original(path, directory, storage=default_storage):
+    """Move a staged upload to a content-hashed name under ``directory``"""
+    ext = posixpath.splitext(path)[1].lower()
+    with storage.open(path) as staged:
+        name = posixpath.join(directory, file_digest(staged)[:16] + ext)
+        _save_once(name, staged, storage)
+    if name != path:
+        storage.delete(path)
+    return name
+
+
+def render_thumbnails(path, directory, storage=default_storage):
+    """
+    Render square thumbnails of ``path`` in every size and format.
+
+    Returns ``{size: {format: name}}`` with sizes as strings, ready to be
+    stored in a JSONField.
+    """
+    largest = max(THUMBNAIL_SIZES)
+    with storage.open(path) as f:
+        image = Image.open(f)
+        # Let the JPEG decoder downscale while decoding large photos
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    thumbnails = {}
+    # Each size is resampled from the previous, larger one
+    for size in sorted(THUMBNAIL_SIZES, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        variants = {}
+        for fmt, (pil_format, ext, options) in THUMBNAIL_FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, pil_format, **options)
+            digest = hashlib.sha256(buffer.getvalue()).hexdigest()[:16]
+            name = posixpath.join(directory, 'thumbs', f'{digest}_{size}.{ext}')
+            variants[fmt] = _save_once(name, ContentFile(buffer.getvalue()), storage)
+        thumbnails[str(size)] = variants
+    return thumbnails
+
+
+def variant_urls(thumbnails, build_url=None, storage=default_storage):
+    """Map stored thumbnail names to URLs, optionally made absolute"""
+    urls = {}
+    for size, variants in thumbnails.items():
+        urls[size] = {}
+        for fmt, name in variants.items():
+            url = storage.url(name)
+            urls[size][fmt] = build_url(url) if build_url else url
+    return urls
+
+
+def is_hashed_name(path):
+    return bool(HASHED_NAME_RE.search(path))
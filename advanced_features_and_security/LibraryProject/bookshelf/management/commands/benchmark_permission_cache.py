@@ -0,0 +1,57 @@
+import time
+from datetime import date
+
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookshelf.models import Book, CustomUser
+from bookshelf.permission_cache import bump_permissions_version, get_permission_cache
+
+
+class Command(BaseCommand):
+    help = 'Measure authenticated book_list requests/sec with a cold and a warm permission cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100, help='Books to create')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        if get_permission_cache() is None:
+            raise CommandError('Set PERMISSION_CACHE_ALIAS to a shared cache to benchmark the permission cache.')
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            Book.objects.bulk_create([
+                Book(title=f'Benchmark book {i}', author=f'Author {i % 50}', publication_year=1900 + i % 120)
+                for i in range(options['books'])
+            ])
+            group = Group.objects.create(name='Benchmark viewers')
+            group.permissions.set(Permission.objects.filter(content_type__app_label='bookshelf'))
+            user = CustomUser.objects.create_user(
+                username='benchmark_permission_user', email='benchmark@example.com', date_of_birth=date(1990, 1, 1),
+            )
+            user.groups.add(group)
+
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            url = reverse('book_list')
+            for label, cold in [('cold', True), ('warm', False)]:
+                rate, queries = self.measure(client, url, options['requests'], cold)
+                self.stdout.write(f'{label}: {rate:8.1f} req/s   {queries} queries/request')
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, count, cold):
+        client.get(url, secure=True)  # prime the session, the page and the permission cache
+        elapsed = 0.0
+        for _ in range(count):
+            if cold:
+                bump_permissions_version()
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url, secure=True)
+            elapsed += time.perf_counter() - start
+        return count / elapsed, len(queries)
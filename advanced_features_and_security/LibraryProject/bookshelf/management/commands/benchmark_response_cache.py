@@ -0,0 +1,76 @@
+import tempfile
+import time
+from datetime import date
+
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from bookshelf.models import Book, CustomUser
+from relationship_app.models import Author, Book as CatalogBook
+
+BACKENDS = {
+    'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+    'file': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure book list/detail requests/sec with and without the response cache, per cache backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=500, help='Books to create in each app')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            books = Book.objects.bulk_create([
+                Book(title=f'Benchmark book {i}', author=f'Author {i % 50}', publication_year=1900 + i % 120)
+                for i in range(options['books'])
+            ])
+            authors = Author.objects.bulk_create([Author(name=f'Author {i}') for i in range(50)])
+            CatalogBook.objects.bulk_create([
+                CatalogBook(title=f'Benchmark book {i}', author=authors[i % 50])
+                for i in range(options['books'])
+            ])
+            user = CustomUser.objects.create_user(
+                username='benchmark_cache_user', email='benchmark@example.com', date_of_birth=date(1990, 1, 1),
+            )
+            user.user_permissions.set(Permission.objects.filter(content_type__app_label__in=['bookshelf', 'relationship_app']))
+            urls = {
+                'book_list': reverse('book_list'),
+                'book_detail': reverse('book_detail', kwargs={'book_id': books[0].pk}),
+                'list_books': reverse('list_books'),
+            }
+
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            for backend, config in BACKENDS.items():
+                with tempfile.TemporaryDirectory() as location, \
+                        override_settings(CACHES={'default': {'LOCATION': location, **config}}):
+                    self.stdout.write(f'{backend} backend')
+                    for name, url in urls.items():
+                        uncached = self.measure(client, url, options['requests'], clear_cache=True)
+                        cached = self.measure(client, url, options['requests'], clear_cache=False)
+                        self.stdout.write(
+                            f'  {name:12} uncached: {uncached:8.1f} req/s   cached: {cached:8.1f} req/s'
+                            f'   speedup: {cached / uncached:5.1f}x'
+                        )
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, count, clear_cache):
+        client.get(url, secure=True)  # prime the session and, for cached runs, the cache
+        elapsed = 0.0
+        for _ in range(count):
+            if clear_cache:
+                # Sessions live in the database, so this only drops cached responses
+                caches['default'].clear()
+            start = time.perf_counter()
+            client.get(url, secure=True)
+            elapsed += time.perf_counter() - start
+        return count / elapsed
@@ -0,0 +1,60 @@
+import time
+from datetime import date
+
+from django.contrib.auth.signals import user_logged_in
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from bookshelf.models import CustomUser, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Measure user saves/sec and queries per save for an admin-style bulk edit and for logins'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to create and edit')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create([
+                CustomUser(
+                    username=f'benchmark_save_{i}', email=f'benchmark_save_{i}@example.com',
+                    date_of_birth=date(1990, 1, 1), password='!',
+                )
+                for i in range(options['users'])
+            ])
+            UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+            pks = [user.pk for user in users]
+
+            # The admin saves each edited user, with the profile loaded for display
+            users = list(CustomUser.objects.select_related('userprofile').filter(pk__in=pks))
+            self.report('bulk edit, profile unchanged', users, lambda user: self.edit(user, profile=False))
+            self.report('bulk edit, role changed', users, lambda user: self.edit(user, profile=True))
+
+            # Logins only write last_login, through the user_logged_in receiver
+            request = RequestFactory().get('/')
+            users = list(CustomUser.objects.filter(pk__in=pks))
+            self.report('login', users, lambda user: user_logged_in.send(
+                sender=CustomUser, request=request, user=user,
+            ))
+            transaction.set_rollback(True)
+
+    def edit(self, user, profile):
+        user.first_name = 'Edited' if user.first_name != 'Edited' else 'Again'
+        if profile:
+            user.userprofile.role = 'librarian' if user.userprofile.role != 'librarian' else 'member'
+        user.save()
+
+    def report(self, label, users, action):
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for user in users:
+                action(user)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{label:30} {len(users) / elapsed:8.1f} saves/s   {len(queries) / len(users):.1f} queries/save'
+        )
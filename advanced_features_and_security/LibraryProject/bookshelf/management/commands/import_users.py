@@ -0,0 +1,164 @@
+"""
+Bulk-load users from a CSV or NDJSON file.
+
+Each row has ``username``, ``email`` and ``date_of_birth`` (YYYY-MM-DD),
+and optionally ``first_name``, ``last_name``, ``role`` (default member),
+``groups`` (a list, or ``;``-separated in CSV) and either ``password``
+(plain text, hashed here) or ``password_hash`` (already encoded, stored as
+is). Rows without a password get an unusable one.
+
+Rows are processed in batches: passwords are hashed in a process pool,
+then users, their UserProfile rows and group memberships are inserted with
+bulk_create. Other users get their profile on the first role lookup
+(see relationship_app.roles); imported ones get it here, with their role.
+"""
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bookshelf.models import CustomUser, UserProfile
+
+ROLES = {role for role, _ in UserProfile.role_choice}
+
+
+def _init_worker():
+    # Workers started with spawn/forkserver begin without Django set up
+    import django
+    django.setup()
+
+
+def _hash_password(password, hasher):
+    return make_password(password, hasher=hasher or 'default')
+
+
+def read_rows(path, file_format):
+    """Yield the rows of a CSV or NDJSON file as dicts"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                groups = row.get('groups') or ''
+                row['groups'] = [name.strip() for name in groups.split(';') if name.strip()]
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    if isinstance(row.get('groups'), str):
+                        row['groups'] = [row['groups']]
+                    yield row
+
+
+class Command(BaseCommand):
+    help = 'Create users, their profiles and group memberships in bulk from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON (.ndjson/.jsonl) file of users')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='File format, guessed from the extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users inserted per transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Password hashing processes')
+        parser.add_argument(
+            '--hasher', help='Password hasher to use, one of PASSWORD_HASHERS; '
+            'passwords are upgraded to the default hasher on first login',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        groups = {group.name: group for group in Group.objects.all()}
+        self.seen = set()
+        self.created = self.skipped = 0
+        self.workers = options['workers']
+
+        rows = read_rows(path, file_format)
+        start = time.perf_counter()
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker) if self.workers > 1 else None
+        try:
+            while batch := list(itertools.islice(rows, options['batch_size'])):
+                self.import_batch(batch, groups, pool, options['hasher'])
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{self.created} users created, {self.skipped} skipped '
+                    f'({self.created / elapsed:.0f} rows/s)'
+                )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {self.created} users in {time.perf_counter() - start:.1f}s'
+        ))
+
+    def import_batch(self, batch, groups, pool, hasher):
+        rows = []
+        for row in batch:
+            username = (row.get('username') or '').strip()
+            try:
+                if not username or not row.get('email'):
+                    raise ValueError('username and email are required')
+                if username in self.seen:
+                    raise ValueError('duplicate username')
+                row['date_of_birth'] = date.fromisoformat(row.get('date_of_birth') or '')
+                row['role'] = row.get('role') or 'member'
+                if row['role'] not in ROLES:
+                    raise ValueError(f"unknown role {row['role']!r}")
+                unknown = [name for name in row.get('groups') or () if name not in groups]
+                if unknown:
+                    raise ValueError(f"unknown groups {', '.join(unknown)}")
+            except (TypeError, ValueError) as e:
+                self.stderr.write(f'Skipping {username or row}: {e}')
+                self.skipped += 1
+                continue
+            self.seen.add(username)
+            row['username'] = username
+            rows.append(row)
+
+        existing = set(
+            CustomUser.objects.filter(username__in=[row['username'] for row in rows])
+            .values_list('username', flat=True)
+        )
+        self.skipped += len(existing)
+        rows = [row for row in rows if row['username'] not in existing]
+
+        plain = [row for row in rows if row.get('password') and not row.get('password_hash')]
+        passwords = [row['password'] for row in plain]
+        hashers = itertools.repeat(hasher)
+        if pool is not None:
+            chunksize = max(1, len(passwords) // (4 * self.workers))
+            hashed = pool.map(_hash_password, passwords, hashers, chunksize=chunksize)
+        else:
+            hashed = map(_hash_password, passwords, hashers)
+        for row, password_hash in zip(plain, hashed):
+            row['password_hash'] = password_hash
+
+        users = [
+            CustomUser(
+                username=row['username'],
+                email=CustomUser.objects.normalize_email(row['email']),
+                first_name=row.get('first_name') or '',
+                last_name=row.get('last_name') or '',
+                date_of_birth=row['date_of_birth'],
+                password=row.get('password_hash') or make_password(None),
+            )
+            for row in rows
+        ]
+        Membership = CustomUser.groups.through
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users)
+            UserProfile.objects.bulk_create([
+                UserProfile(user=user, role=row['role']) for user, row in zip(users, rows)
+            ])
+            Membership.objects.bulk_create([
+                Membership(customuser=user, group=groups[name])
+                for user, row in zip(users, rows) for name in row.get('groups') or ()
+            ])
+        self.created += len(users)
@@ -0,0 +1,65 @@
+import logging
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from bookshelf.images import render_thumbnails, store_original
+from bookshelf.models import CustomUser
+
+PROFILE_PHOTO_DIR = 'profile_photos'
+
+logger = logging.getLogger(__name__)
+
+
+def process_profile_photo(user_id, path):
+    """Validate an uploaded photo, move it to a content-hashed name and render its thumbnails"""
+    try:
+        with default_storage.open(path) as upload:
+            Image.open(upload).verify()
+        original = store_original(path, PROFILE_PHOTO_DIR)
+        thumbnails = render_thumbnails(original, PROFILE_PHOTO_DIR)
+    except Exception:
+        # Not an image, a decompression bomb, or a truncated file that only
+        # fails to decode: drop it, or it would be picked first again on
+        # every run. A stored original may be shared and is left in place.
+        logger.exception('Dropping profile photo %s of user %s', path, user_id)
+        CustomUser.objects.filter(pk=user_id, profile_photo=path).update(profile_photo=None)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        return False
+
+    # Only applies if the user has not uploaded another photo meanwhile
+    CustomUser.objects.filter(pk=user_id, profile_photo=path).update(
+        profile_photo=original, profile_thumbnails=thumbnails
+    )
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails for newly uploaded profile photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Photos processed per round')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Seconds to wait when there is nothing to do')
+        parser.add_argument('--once', action='store_true', help='Process pending photos once and exit')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            pending = list(
+                CustomUser.objects.exclude(profile_photo='').exclude(profile_photo=None)
+                .filter(profile_thumbnails={})
+                .values_list('pk', 'profile_photo')[:options['batch_size']]
+            )
+            for user_id, path in pending:
+                process_profile_photo(user_id, path)
+            total += len(pending)
+            if pending:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} profile photos'))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from bookshelf.permission_cache import bump_permissions_version
 from bookshelf.models import Book
 
 
@@ -42,6 +43,11 @@ class Command(BaseCommand):
             )
             return
 
+        book_permissions = {
+            permission.codename: permission
+            for permission in Permission.objects.filter(content_type=book_content_type)
+        }
+
         for group_name, group_info in groups_data.items():
             # Create or get the group
             group, created = Group.objects.get_or_create(name=group_name)
@@ -61,45 +67,39 @@ class Command(BaseCommand):
                 if options['reset']:
                     self.stdout.write(f'Cleared existing permissions for {group_name}')
             
-            # Add permissions to the group
-            permissions_added = 0
+            # Add permissions to the group in a single call
+            permissions = []
             for permission_codename in group_info['permissions']:
-                try:
-                    # Get the permission for the Book model
-                    permission = Permission.objects.get(
-                        codename=permission_codename,
-                        content_type=book_content_type
-                    )
-                    group.permissions.add(permission)
-                    permissions_added += 1
-                    self.stdout.write(
-                        f'Added permission: {permission.name}'
-                    )
-                except Permission.DoesNotExist:
+                permission = book_permissions.get(permission_codename)
+                if permission is None:
                     self.stdout.write(
                         self.style.ERROR(
                             f'Permission {permission_codename} does not exist for Book model'
                         )
                     )
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f'Error adding permission {permission_codename}: {e}'
-                        )
-                    )
+                    continue
+                permissions.append(permission)
+                self.stdout.write(
+                    f'Added permission: {permission.name}'
+                )
+            group.permissions.add(*permissions)
+            permissions_added = len(permissions)
             
             self.stdout.write(
                 f'  Summary: {permissions_added}/{len(group_info["permissions"])} permissions added to {group_name}'
             )
             self.stdout.write(f'  Description: {group_info["description"]}\n')
 
+        # Members of the groups must not keep their old cached permissions
+        bump_permissions_version()
+
         # Display summary
         self.stdout.write(self.style.SUCCESS('=' * 50))
         self.stdout.write(self.style.SUCCESS('Groups setup completed!'))
         self.stdout.write(self.style.SUCCESS('=' * 50))
         
         # Show all groups and their permissions
-        for group in Group.objects.all():
+        for group in Group.objects.prefetch_related('permissions'):
             self.stdout.write(f'\n📁 {group.name}:')
             permissions = group.permissions.all()
             if permissions:
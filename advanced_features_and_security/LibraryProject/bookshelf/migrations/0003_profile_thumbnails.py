@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0002_alter_book_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0003_profile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='profile_photo',
+            field=models.ImageField(blank=True, null=True, upload_to='profile_photos/pending/'),
+        ),
+    ]
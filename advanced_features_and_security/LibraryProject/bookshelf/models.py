@@ -1,8 +1,14 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser, BaseUserManager, UserManager
-from django.db.models.signals import post_save
+from django.contrib.auth.models import AbstractUser, BaseUserManager, Group, Permission, UserManager
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from .permission_cache import bump_permissions_version
+from .response_cache import purge
+
+# Uploaded profile photos not yet validated by process_profile_photos
+PENDING_PHOTO_DIR = 'profile_photos/pending'
+
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
@@ -52,13 +58,22 @@ class CustomUserManager(UserManager):
 
 class CustomUser(AbstractUser):
     date_of_birth = models.DateField()
-    profile_photo = models.ImageField(upload_to='profile_photos/', null=True, blank=True)
+    # Uploads wait here, unvalidated, until process_profile_photos moves them
+    # to content-hashed names
+    profile_photo = models.ImageField(upload_to=f'{PENDING_PHOTO_DIR}/', null=True, blank=True)
+    # {size: {format: name}}, filled in by the process_profile_photos worker
+    profile_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     
     objects = CustomUserManager()
     
     def __str__(self):
         return self.username
 
+    def profile_photo_variants(self):
+        """Thumbnail URLs by size and format, empty until the worker has run"""
+        from .images import variant_urls
+        return variant_urls(self.profile_thumbnails)
+
 class UserProfile(models.Model):
     role_choice = [
         ('admin', 'Admin'),
@@ -72,15 +87,74 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded values so unchanged profiles are not written back
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    def get_dirty_fields(self):
+        """Names of the fields changed since the profile was loaded or saved"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in self._meta.concrete_fields if not field.primary_key]
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in loaded and loaded[field.attname] is not models.DEFERRED
+            and getattr(self, field.attname) != loaded[field.attname]
+        ]
+
+# Signal handler invalidating cached book pages
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def purge_book_responses(sender, instance, **kwargs):
+    purge('books', f'book:{instance.pk}')
+
+# Signal handlers invalidating cached permission sets (see permission_cache.py).
+# Deleting a group or permission removes its through rows without m2m_changed.
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def invalidate_permissions_on_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permissions_version()
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def invalidate_permissions_on_delete(sender, **kwargs):
+    bump_permissions_version()
+
 # Signal handlers for CustomUser
-@receiver(post_save, sender=CustomUser)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
+@receiver(pre_save, sender=CustomUser)
+def reset_profile_thumbnails(sender, instance, **kwargs):
+    # A photo that is not committed yet is a new upload; its thumbnails are
+    # rendered later by the process_profile_photos worker
+    if not instance.profile_photo or not instance.profile_photo._committed:
+        instance.profile_thumbnails = {}
 
 @receiver(post_save, sender=CustomUser)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login; and only a profile already loaded on
+    # this instance can hold changes, so nothing is queried to find out
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    if not CustomUser.userprofile.is_cached(instance):
+        return
+    try:
+        profile = instance.userprofile
+    except UserProfile.DoesNotExist:
+        return
+    if profile._state.adding:
+        # A new profile attached to the user has no row to update yet
+        profile.save()
+        return
+    dirty_fields = profile.get_dirty_fields()
+    if dirty_fields:
+        profile.save(update_fields=dirty_fields)
 
 
@@ -0,0 +1,59 @@
+"""
+Versioned cache keys for users' permission sets.
+
+The version is global: it is bumped whenever group or user permissions
+change (see the signal handlers in models.py), which makes every cached
+set unreachable at once.
+
+Sets and the version live in the ``PERMISSION_CACHE_ALIAS`` cache, which
+must be shared by all worker processes (Redis, Memcached, the database
+cache, or the file cache on a single host): with a per-process cache a
+permission revoked on one worker stays granted on the others. With the
+setting set to None nothing is cached across requests, and a LocMemCache
+alias is rejected.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from .versions import bump_version, get_version
+
+PERMISSION_CACHE_TIMEOUT = getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 60 * 60)
+
+PERMISSIONS_VERSION_KEY = 'bookshelf:permissions:version'
+
+
+def get_permission_cache():
+    """The cache shared for permission sets, None when none is configured"""
+    alias = getattr(settings, 'PERMISSION_CACHE_ALIAS', None)
+    if alias is None:
+        return None
+    cache = caches[alias]
+    if isinstance(cache, LocMemCache):
+        raise ImproperlyConfigured(
+            f"PERMISSION_CACHE_ALIAS '{alias}' is a LocMemCache, which is not shared between processes."
+        )
+    return cache
+
+
+def get_permissions_version():
+    cache = get_permission_cache()
+    if cache is None:
+        return None
+    return get_version(cache, PERMISSIONS_VERSION_KEY)
+
+
+def bump_permissions_version():
+    """Invalidate the cached permissions of every user"""
+    cache = get_permission_cache()
+    if cache is not None:
+        bump_version(cache, PERMISSIONS_VERSION_KEY)
+
+
+def permissions_cache_key(user):
+    # A superuser gets every permission, so the flag is part of the key;
+    # date_joined keeps an account created under a reused id from picking
+    # up the set of the one deleted before it
+    joined = int(user.date_joined.timestamp() * 1_000_000)
+    return f'bookshelf:permissions:{user.pk}:{joined}:{int(user.is_superuser)}:v{get_permissions_version()}'
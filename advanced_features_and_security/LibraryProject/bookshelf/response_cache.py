@@ -0,0 +1,204 @@
+"""
+Server-side cache for whole view responses of the book and catalog pages.
+
+This is a copy of django_blog's ``blog.response_cache``: the projects are
+deployed separately and share no package, so a fix to the hit/stale/miss
+logic, the metrics or ``purge()`` has to be made in both. What differs
+here: there is no DRF, so entries do not vary on a renderer format, and
+the tags are the ones the bookshelf and relationship_app signal handlers
+purge (``books``, ``book:<id>``, ``catalog``).
+
+Entries are keyed on the path, the query string and who is asking:
+anonymous visitors share one entry, logged-in users share entries with
+everyone holding the same permissions, or get their own with
+``vary_on_user`` (book pages greet the user by name).
+
+Each tag has a version in the cache (see ``bookshelf.versions``) and an entry is
+only served while the versions it was stored under are current, so
+``purge()`` just bumps versions and works on any backend (locmem, file,
+...) without a tag index.
+
+With ``stale_while_revalidate`` an expired entry is kept that many seconds
+longer: the first request after expiry renders a fresh copy while
+concurrent ones are served the stale one. Purged entries are never served.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from .versions import bump_version, get_versions
+
+KEY_PREFIX = 'response-cache'
+OUTCOMES = ('hit', 'stale', 'miss', 'bypass')
+
+# Names of the cached views seen by this process, for get_metrics()
+_views = set()
+
+
+def _cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _tag_key(tag):
+    return f'{KEY_PREFIX}:tag:{tag}'
+
+
+def _tag_versions(cache, tags):
+    keys = {_tag_key(tag): tag for tag in tags}
+    return {keys[key]: version for key, version in get_versions(cache, list(keys)).items()}
+
+
+def _bump(cache, tag):
+    bump_version(cache, _tag_key(tag))
+
+
+def purge(*tags):
+    """Invalidate every cached response carrying any of ``tags``"""
+    cache = _cache()
+    for tag in tags:
+        _bump(cache, tag)
+    # Saves inside a transaction (import_users, the admin) are not visible
+    # to other requests until the commit, so a list rendered in between
+    # holds the old rows under the new versions: bump once more after it
+    transaction.on_commit(lambda: [_bump(cache, tag) for tag in tags])
+
+
+def _count(cache, name, outcome):
+    key = f'{KEY_PREFIX}:metrics:{name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_metrics():
+    """Hit/stale/miss/bypass counts and the hit ratio of each cached view"""
+    keys = {
+        f'{KEY_PREFIX}:metrics:{name}:{outcome}': (name, outcome)
+        for name in _views for outcome in OUTCOMES
+    }
+    counts = _cache().get_many(keys)
+    metrics = {name: dict.fromkeys(OUTCOMES, 0) for name in sorted(_views)}
+    for key, count in counts.items():
+        name, outcome = keys[key]
+        metrics[name][outcome] = count
+    for counts in metrics.values():
+        served = counts['hit'] + counts['stale']
+        lookups = served + counts['miss']
+        counts['hit_ratio'] = round(served / lookups, 4) if lookups else None
+    return metrics
+
+
+def _vary(request, vary_on_user):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if user.is_active and user.is_superuser:
+        perms = 'superuser'
+    else:
+        # permission_required loaded these onto the user for this request
+        perms = ','.join(sorted(user.get_all_permissions()))
+    return f'user:{user.pk}:{perms}' if vary_on_user else f'perms:{perms}'
+
+
+def _page_key(name, request, vary_on_user):
+    parts = (
+        request.path,
+        urlencode(sorted(request.GET.lists()), doseq=True),
+        _vary(request, vary_on_user),
+    )
+    digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+    return f'{KEY_PREFIX}:page:{name}:{digest}'
+
+
+def _has_messages(request):
+    # The "Book ... was created" messages are shown on the next page, which
+    # must be rendered for this visitor and not stored for the others
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def _cacheable(request, response):
+    return (
+        request.method == 'GET'
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # The page embeds this visitor's CSRF token
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _replay(entry, state):
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    response['X-Cache'] = state
+    return response
+
+
+def cache_response(timeout=None, tags=(), stale_while_revalidate=0, vary_on_user=False, name=None):
+    """
+    Cache a view's GET responses.
+
+    Entries and metrics are grouped under ``name``, which defaults to the
+    URL name. ``tags`` are surrogate keys formatted with the URL kwargs, e.g.
+    ``'book:{book_id}'``. Put the decorator below any permission check so
+    the check still runs on every request. ``timeout`` defaults to the
+    RESPONSE_CACHE_TIMEOUT setting.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cache = _cache()
+            match = getattr(request, 'resolver_match', None)
+            view_name = name or (match.view_name if match else f'{view.__module__}.{view.__qualname__}')
+            _views.add(view_name)
+            if request.method not in ('GET', 'HEAD') or _has_messages(request):
+                _count(cache, view_name, 'bypass')
+                return view(request, *args, **kwargs)
+
+            key = _page_key(view_name, request, vary_on_user)
+            entry = cache.get(key)
+            # Versions as of before the render: a book saved meanwhile
+            # leaves this copy stale on the next lookup
+            versions = _tag_versions(cache, [tag.format(**kwargs) for tag in tags])
+            if entry is not None and entry['tags'] == versions:
+                if time.time() < entry['expires']:
+                    _count(cache, view_name, 'hit')
+                    return _replay(entry, 'HIT')
+                if stale_while_revalidate and not cache.add(f'{key}:revalidating', 1, stale_while_revalidate):
+                    # The revalidation lock is held, a fresh copy is on its way
+                    _count(cache, view_name, 'stale')
+                    return _replay(entry, 'STALE')
+
+            _count(cache, view_name, 'miss')
+            fresh_for = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300) if timeout is None else timeout
+
+            def store(response):
+                if _cacheable(request, response):
+                    cache.set(key, {
+                        'content': response.content,
+                        'status': response.status_code,
+                        'headers': [item for item in response.items() if item[0] != 'X-Cache'],
+                        'tags': versions,
+                        'expires': time.time() + fresh_for,
+                    }, fresh_for + stale_while_revalidate)
+                if stale_while_revalidate:
+                    cache.delete(f'{key}:revalidating')
+
+            response = view(request, *args, **kwargs)
+            response['X-Cache'] = 'MISS'
+            if getattr(response, 'is_rendered', True):
+                store(response)
+            else:
+                response.add_post_render_callback(store)
+            return response
+        return wrapper
+    return decorator
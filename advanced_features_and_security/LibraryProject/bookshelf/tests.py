@@ -1,3 +1,328 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+from PIL import Image
+
+from .models import Book, CustomUser, UserProfile
+from .permission_cache import get_permissions_version
+from .views import serve_media
+
+
+class ProfilePhotoPipelineTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = self.settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        image = BytesIO()
+        Image.new('RGB', (800, 600), 'green').save(image, 'JPEG')
+        self.user = CustomUser.objects.create_user(
+            username='alice', email='alice@test.com', password='alicePass123',
+            date_of_birth=date(1990, 1, 1),
+            profile_photo=SimpleUploadedFile('alice.jpg', image.getvalue()),
+        )
+
+    def test_thumbnails_rendered_by_worker(self):
+        self.assertEqual(self.user.profile_thumbnails, {})
+        call_command('process_profile_photos', '--once', stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.assertRegex(self.user.profile_photo.name, r'^profile_photos/[0-9a-f]{16}\.jpg$')
+        variants = self.user.profile_photo_variants()
+        self.assertEqual(set(variants), {'64', '128', '512'})
+        with Image.open(f"{self.media_root}/{self.user.profile_thumbnails['64']['webp']}") as thumbnail:
+            self.assertEqual(thumbnail.size, (64, 64))
+
+        response = serve_media(RequestFactory().get(variants['128']['jpeg']), self.user.profile_thumbnails['128']['jpeg'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        response.close()
+
+    def test_unprocessed_uploads_not_served(self):
+        self.assertTrue(self.user.profile_photo.name.startswith('profile_photos/pending/'))
+        request = RequestFactory().get(self.user.profile_photo.url)
+        with self.assertRaises(Http404):
+            serve_media(request, self.user.profile_photo.name)
+        # Not even under a name that looks content-hashed
+        with self.assertRaises(Http404):
+            serve_media(request, 'profile_photos/pending/0123456789abcdef.jpg')
+        # The view is only routed when DEBUG is on
+        with self.assertRaises(NoReverseMatch):
+            reverse('media', kwargs={'path': 'x.jpg'})
+
+    def test_new_upload_resets_thumbnails(self):
+        call_command('process_profile_photos', '--once', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.profile_thumbnails)
+
+        self.user.first_name = 'Alice'
+        self.user.save()
+        self.assertTrue(self.user.profile_thumbnails)
+
+        self.user.profile_photo = SimpleUploadedFile('other.png', b'not an image')
+        self.user.save()
+        self.assertEqual(self.user.profile_thumbnails, {})
+
+        # Invalid uploads are dropped by the worker
+        with self.assertLogs('bookshelf', 'ERROR'):
+            call_command('process_profile_photos', '--once', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_photo)
+
+    def upload(self, username, content):
+        return CustomUser.objects.create_user(
+            username=username, email=f'{username}@test.com', password=f'{username}Pass123',
+            date_of_birth=date(1990, 1, 1), profile_photo=SimpleUploadedFile(f'{username}.jpg', content),
+        )
+
+    def test_undecodable_uploads_dropped(self):
+        image = BytesIO()
+        Image.new('RGB', (800, 600), 'red').save(image, 'JPEG')
+        truncated = self.upload('truncated', image.getvalue()[:len(image.getvalue()) // 2])
+        image = BytesIO()
+        Image.new('RGB', (1000, 1000), 'red').save(image, 'JPEG')
+        bomb = self.upload('bomb', image.getvalue())
+
+        # Twice the limit is refused outright; the 800x600 photo is let through
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 480000), self.assertLogs('bookshelf', 'ERROR') as logs:
+            call_command('process_profile_photos', '--once', stdout=StringIO())
+        self.assertEqual(len(logs.records), 2)
+        for user in (truncated, bomb):
+            user.refresh_from_db()
+            self.assertFalse(user.profile_photo)
+        # Good photos in the same run are still processed
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.profile_thumbnails)
+
+
+class BookResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = Book.objects.create(title='Dune', author='Frank Herbert', publication_year=1965)
+        self.alice = self.create_user('alice', 'can_view')
+        self.bob = self.create_user('bob', 'can_view')
+        self.url = reverse('book_list')
+
+    def create_user(self, username, *codenames):
+        user = CustomUser.objects.create_user(
+            username=username, email=f'{username}@test.com', password=f'{username}Pass123',
+            date_of_birth=date(1990, 1, 1),
+        )
+        user.user_permissions.set(Permission.objects.filter(content_type__app_label='bookshelf', codename__in=codenames))
+        return user
+
+    def get(self, user, url=None):
+        self.client.force_login(user)
+        return self.client.get(url or self.url, secure=True)
+
+    def test_pages_cached_per_user(self):
+        self.assertEqual(self.get(self.alice)['X-Cache'], 'MISS')
+        response = self.get(self.alice)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertContains(response, 'Welcome, alice!')
+
+        response = self.get(self.bob)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Welcome, bob!')
+
+    def test_book_changes_purge_pages(self):
+        detail_url = reverse('book_detail', kwargs={'book_id': self.book.pk})
+        self.get(self.alice)
+        self.get(self.alice, detail_url)
+        self.book.title = 'Dune Messiah'
+        self.book.save()
+        for url in (self.url, detail_url):
+            response = self.get(self.alice, url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertContains(response, 'Dune Messiah')
+
+    def test_permission_checked_before_cache(self):
+        self.get(self.alice)
+        self.alice.user_permissions.clear()
+        self.assertEqual(self.get(self.alice).status_code, 403)
+
+
+class PermissionCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        settings = self.settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'permissions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+            },
+            PERMISSION_CACHE_ALIAS='permissions',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        Book.objects.create(title='Dune', author='Frank Herbert', publication_year=1965)
+        self.can_view = Permission.objects.get(codename='can_view')
+        self.viewers = Group.objects.create(name='Viewers')
+        self.viewers.permissions.add(self.can_view)
+        self.user = CustomUser.objects.create_user(
+            username='alice', email='alice@test.com', password='alicePass123',
+            date_of_birth=date(1990, 1, 1),
+        )
+        self.user.groups.add(self.viewers)
+        self.client.force_login(self.user)
+        self.url = reverse('book_list')
+
+    def permission_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries if 'auth_permission' in query['sql']]
+
+    def test_no_permission_queries_on_warm_cache(self):
+        self.assertEqual(len(self.permission_queries()), 2)
+        self.assertEqual(self.permission_queries(), [])
+
+    def test_group_change_invalidates(self):
+        self.permission_queries()
+        self.viewers.permissions.remove(self.can_view)
+        self.assertEqual(self.client.get(self.url, secure=True).status_code, 403)
+
+        self.user.user_permissions.add(self.can_view)
+        self.assertEqual(self.client.get(self.url, secure=True).status_code, 200)
+
+    def test_not_cached_without_shared_cache(self):
+        with self.settings(PERMISSION_CACHE_ALIAS=None):
+            self.permission_queries()
+            self.assertEqual(len(self.permission_queries()), 2)
+
+    def test_local_memory_cache_refused(self):
+        with self.settings(PERMISSION_CACHE_ALIAS='default'), self.assertRaises(ImproperlyConfigured):
+            self.client.get(self.url, secure=True)
+
+    def test_setup_groups_bumps_version(self):
+        version = get_permissions_version()
+        call_command('setup_groups', stdout=StringIO())
+        self.assertNotEqual(get_permissions_version(), version)
+
+
+class ImportUsersTestCase(TestCase):
+    def setUp(self):
+        call_command('setup_groups', stdout=StringIO())
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_csv_import(self):
+        path = self.write('users.csv', (
+            'username,email,password,date_of_birth,role,groups\n'
+            'ann,ann@test.com,annPass123,1990-01-01,librarian,Editors;Viewers\n'
+            'ben,ben@test.com,,1991-02-03,,\n'
+            'ann,dup@test.com,,1990-01-01,,\n'
+            'cid,cid@test.com,,not-a-date,,\n'
+            'dot,dot@test.com,,1990-01-01,,Nobody\n'
+        ))
+        with self.settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            call_command('import_users', path, '--workers', '1', stdout=StringIO(), stderr=StringIO())
+            ann = CustomUser.objects.get(username='ann')
+            self.assertTrue(ann.check_password('annPass123'))
+
+        self.assertEqual(sorted(CustomUser.objects.values_list('username', flat=True)), ['ann', 'ben'])
+        self.assertEqual(ann.userprofile.role, 'librarian')
+        self.assertEqual(sorted(ann.groups.values_list('name', flat=True)), ['Editors', 'Viewers'])
+        self.assertTrue(ann.has_perm('bookshelf.can_create'))
+        ben = CustomUser.objects.get(username='ben')
+        self.assertFalse(ben.has_usable_password())
+        self.assertEqual(ben.userprofile.role, 'member')
+
+    def test_ndjson_import_hashes_in_pool(self):
+        rows = [
+            {'username': f'user{i}', 'email': f'user{i}@test.com', 'password': f'secret-{i}',
+             'date_of_birth': '1990-01-01', 'groups': ['Viewers']}
+            for i in range(2)
+        ]
+        path = self.write('users.ndjson', ''.join(json.dumps(row) + '\n' for row in rows))
+        out = StringIO()
+        call_command('import_users', path, '--workers', '2', '--batch-size', '1', stdout=out)
+        self.assertIn('2 users created', out.getvalue())
+        self.assertEqual(UserProfile.objects.count(), 2)
+        self.assertTrue(CustomUser.objects.get(username='user1').check_password('secret-1'))
+
+        # Existing users are skipped on a second run
+        out = StringIO()
+        call_command('import_users', path, '--workers', '1', stdout=out)
+        self.assertIn('0 users created, 2 skipped', out.getvalue())
+
+
+class UserProfileSaveTestCase(TestCase):
+    def setUp(self):
+        settings = self.settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = CustomUser.objects.create_user(
+            username='profiled', email='profiled@test.com', password='testpass123', date_of_birth=date(1990, 1, 1),
+        )
+        UserProfile.objects.create(user=self.user)
+
+    def profile_queries(self, queries):
+        return [q['sql'] for q in queries.captured_queries if 'bookshelf_userprofile' in q['sql']]
+
+    def test_create_user_does_not_create_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            CustomUser.objects.create_user(
+                username='lazy', email='lazy@test.com', password='testpass123', date_of_birth=date(1990, 1, 1),
+            )
+        self.assertEqual(self.profile_queries(queries), [])
+
+    def test_login_does_not_touch_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.client.login(username='profiled', password='testpass123'))
+        self.assertEqual(self.profile_queries(queries), [])
+
+    def test_unchanged_profile_is_not_saved(self):
+        user = CustomUser.objects.select_related('userprofile').get(pk=self.user.pk)
+        user.first_name = 'Pat'
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.profile_queries(queries), [])
+
+        # A profile that was never loaded is not queried either
+        user = CustomUser.objects.get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(queries), 1)
+
+    def test_changed_profile_is_saved_with_user(self):
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.userprofile.role = 'librarian'
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(self.profile_queries(queries)), 1)
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, 'librarian')
+        self.assertEqual(user.userprofile.get_dirty_fields(), [])
+
+    def test_new_profile_is_created_with_user(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        user = CustomUser.objects.get(pk=self.user.pk)
+        UserProfile(user=user, role='librarian')
+        user.save()
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, 'librarian')
+        self.assertEqual(user.userprofile.get_dirty_fields(), [])
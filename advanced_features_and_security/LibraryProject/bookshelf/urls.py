@@ -8,4 +8,5 @@ urlpatterns = [
     path('book/create/', views.book_create, name='book_create'),
     path('book/<int:book_id>/edit/', views.book_edit, name='book_edit'),
     path('book/<int:book_id>/delete/', views.book_delete, name='book_delete'),
+    path('cache/metrics/', views.response_cache_metrics, name='response_cache_metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Version counters kept in a cache, used by the permission and response
+caches to drop whole groups of entries with one bump.
+
+A counter that is missing starts at the current time in nanoseconds, so
+after an eviction it never falls back to a number older entries were
+stored under. (django_blog has the same helper in blog.versions; the
+projects are deployed separately and share no code.)
+"""
+import time
+
+
+def get_versions(cache, keys):
+    """Map each of ``keys`` to its current version, starting missing ones"""
+    versions = cache.get_many(keys)
+    for key in set(keys) - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return versions
+
+
+def get_version(cache, key):
+    return get_versions(cache, [key])[key]
+
+
+def bump_version(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.static import serve
 from django.contrib.auth.decorators import permission_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse
 from django.contrib import messages
 from django.forms import ModelForm
 from django import forms
 
-from .models import Book
+from .models import PENDING_PHOTO_DIR, Book
 from .forms import ExampleForm, BookForm
+from .images import is_hashed_name
+from .response_cache import cache_response, get_metrics
 
 
 def example_form_view(request):
@@ -33,6 +39,7 @@ def example_form_view(request):
 
 
 @permission_required('bookshelf.can_view', raise_exception=True)
+@cache_response(tags=['books'], stale_while_revalidate=60, vary_on_user=True)
 def book_list(request):
     """
     List all books 
@@ -42,6 +49,7 @@ def book_list(request):
 
 
 @permission_required('bookshelf.can_view', raise_exception=True)
+@cache_response(tags=['book:{book_id}'], vary_on_user=True)
 def book_detail(request, book_id):
     """
     View details of a specific book 
@@ -105,3 +113,22 @@ def book_delete(request, book_id):
     
     return render(request, 'bookshelf/book_delete.html', {'book': book})
 
+
+def serve_media(request, path):
+    """
+    Serve processed profile photos in development (DEBUG only)
+    """
+    # Unvalidated uploads are never served; processed files are content-hashed
+    if path.startswith(f'{PENDING_PHOTO_DIR}/') or not is_hashed_name(path):
+        raise Http404('Not a processed media file')
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    return response
+
+
+@staff_member_required
+def response_cache_metrics(request):
+    """
+    Hit/miss counts of the response cache, per view
+    """
+    return JsonResponse({'views': get_metrics()})
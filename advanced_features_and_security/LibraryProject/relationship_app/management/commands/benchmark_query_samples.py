@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from relationship_app import query_samples
+from relationship_app.models import Author, Book, Librarian, Library
+
+
+class Command(BaseCommand):
+    help = 'Compare looped single-key query_samples calls with the batched helpers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', type=int, default=1000, help='Authors and libraries to look up')
+        parser.add_argument('--books-per-key', type=int, default=5, help='Books per author and per library')
+
+    def handle(self, *args, **options):
+        keys, per_key = options['keys'], options['books_per_key']
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            authors = Author.objects.bulk_create([Author(name=f'Benchmark author {i}') for i in range(keys)])
+            books = Book.objects.bulk_create([
+                Book(title=f'Benchmark book {i}', author=authors[i % keys]) for i in range(keys * per_key)
+            ])
+            libraries = Library.objects.bulk_create([Library(name=f'Benchmark library {i}') for i in range(keys)])
+            Library.books.through.objects.bulk_create([
+                Library.books.through(library=libraries[i % keys], book=book) for i, book in enumerate(books)
+            ])
+            Librarian.objects.bulk_create([
+                Librarian(name=f'Benchmark librarian {i}', library=library) for i, library in enumerate(libraries)
+            ])
+            author_names = [author.name for author in authors]
+            library_names = [library.name for library in libraries]
+
+            scenarios = [
+                ('books by author name',
+                 lambda: {name: list(query_samples.get_books_by_author(author_name=name)) for name in author_names},
+                 lambda: query_samples.get_books_by_authors(author_names=author_names)),
+                ('books in library name',
+                 lambda: {name: list(query_samples.get_books_in_library(library_name=name)) for name in library_names},
+                 lambda: query_samples.get_books_in_libraries(library_names=library_names)),
+                ('librarian for library',
+                 lambda: {name: query_samples.get_librarian_for_library(library_name=name) for name in library_names},
+                 lambda: query_samples.get_librarians_for_libraries(library_names=library_names)),
+            ]
+            for label, looped, batched in scenarios:
+                looped_time, looped_queries = self.measure(looped)
+                batched_time, batched_queries = self.measure(batched)
+                self.stdout.write(
+                    f'{label:22} looped: {looped_time * 1000:8.1f} ms {looped_queries:5} queries   '
+                    f'batched: {batched_time * 1000:7.1f} ms {batched_queries:2} queries   '
+                    f'speedup: {looped_time / batched_time:5.1f}x'
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        return elapsed, len(queries)
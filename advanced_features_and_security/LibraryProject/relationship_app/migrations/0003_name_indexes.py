@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0002_book_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name'], name='rel_author_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='library',
+            index=models.Index(fields=['name'], name='rel_library_name_idx'),
+        ),
+    ]
@@ -1,12 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from bookshelf.response_cache import purge
+
 class Author(models.Model):
     name = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [models.Index(fields=['name'], name='rel_author_name_idx')]
+
     def __str__(self):
         return self.name
 
@@ -18,6 +23,11 @@ class Book(models.Model):
         return self.title
     
     class Meta:
+        indexes = [
+            # Catalog ordering, and the author filter in that order
+            models.Index(fields=['title'], name='rel_book_title_idx'),
+            models.Index(fields=['author', 'title'], name='rel_book_author_title_idx'),
+        ]
         permissions = [
             ("can_add_book", "Can add book"),
             ("can_change_book", "Can change book"),
@@ -28,6 +38,9 @@ class Library(models.Model):
     name = models.CharField(max_length=100)
     books = models.ManyToManyField(Book, related_name="library")
 
+    class Meta:
+        indexes = [models.Index(fields=['name'], name='rel_library_name_idx')]
+
     def __str__(self):
         return self.name
 
@@ -36,4 +49,13 @@ class Librarian(models.Model):
     library = models.OneToOneField(Library, on_delete=models.CASCADE)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+# Signal handler invalidating cached book listings
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def purge_catalog_responses(sender, instance, **kwargs):
+    purge('catalog')
@@ -0,0 +1,69 @@
+"""
+Keyset (seek) pagination for the catalog.
+
+Instead of ``OFFSET n`` the next page is selected with a ``WHERE`` on the
+last row seen, so every page costs the same no matter how deep the reader
+goes. Rows are ordered on ``(<field>, id)``; the id breaks ties between
+rows sharing a value, e.g. two books with the same title.
+"""
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(value, pk):
+    """Encode a (value, pk) position into an opaque url-safe token"""
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a token produced by encode_cursor, raising Http404 if it is invalid"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise Http404('Invalid cursor')
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginate_keyset(queryset, field, page_size, cursor=None):
+    """
+    Return the KeysetPage of ``queryset`` that follows ``cursor``.
+
+    ``field`` is the column the rows are ordered on (ascending). One extra
+    row is fetched to find out whether another page exists.
+    """
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk})
+        )
+
+    rows = list(queryset.order_by(field, 'pk')[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return KeysetPage(rows, next_cursor)
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
 
 
 def get_books_by_author(author_id: int = None, author_name: str = None):
@@ -75,6 +76,77 @@ def get_librarian_for_library(library_id: int = None, library_name: str = None)
             return None
 
 
+# Batched variants: each takes many ids or names and answers in one query,
+# mapping every requested key to its result. Names are resolved through the
+# indexed name columns, in the same query as the books or librarians.
+
+def _group(keys, rows, key_attr):
+    grouped = {key: [] for key in keys}
+    for row in rows:
+        grouped[getattr(row, key_attr)].append(row)
+    return grouped
+
+
+def get_books_by_authors(author_ids: Iterable[int] = None, author_names: Iterable[str] = None) -> Dict[object, List]:
+    """Return ``{author id or name: [books]}`` for many authors in one query.
+
+    Provide either `author_ids` or `author_names`. Authors that do not exist
+    map to an empty list; authors sharing a name share one list.
+    """
+    if author_ids is None and author_names is None:
+        raise ValueError("Provide author_ids or author_names")
+
+    from relationship_app.models import Book
+
+    if author_ids is not None:
+        keys = list(author_ids)
+        books = Book.objects.filter(author_id__in=keys).annotate(batch_key=F('author_id'))
+    else:
+        keys = list(author_names)
+        books = Book.objects.filter(author__name__in=keys).annotate(batch_key=F('author__name'))
+    return _group(keys, books, 'batch_key')
+
+
+def get_books_in_libraries(library_ids: Iterable[int] = None, library_names: Iterable[str] = None) -> Dict[object, List]:
+    """Return ``{library id or name: [books]}`` for many libraries in one query.
+
+    Provide either `library_ids` or `library_names`. Libraries that do not
+    exist map to an empty list; a book in several libraries appears in each.
+    """
+    if library_ids is None and library_names is None:
+        raise ValueError("Provide library_ids or library_names")
+
+    from relationship_app.models import Book
+
+    if library_ids is not None:
+        keys = list(library_ids)
+        books = Book.objects.filter(library__in=keys).annotate(batch_key=F('library__id'))
+    else:
+        keys = list(library_names)
+        books = Book.objects.filter(library__name__in=keys).annotate(batch_key=F('library__name'))
+    return _group(keys, books, 'batch_key')
+
+
+def get_librarians_for_libraries(library_ids: Iterable[int] = None, library_names: Iterable[str] = None) -> Dict[object, Optional[object]]:
+    """Return ``{library id or name: Librarian or None}`` for many libraries in one query.
+
+    Provide either `library_ids` or `library_names`.
+    """
+    if library_ids is None and library_names is None:
+        raise ValueError("Provide library_ids or library_names")
+
+    from relationship_app.models import Librarian
+
+    if library_ids is not None:
+        keys = list(library_ids)
+        librarians = Librarian.objects.filter(library_id__in=keys).annotate(batch_key=F('library_id'))
+    else:
+        keys = list(library_names)
+        librarians = Librarian.objects.filter(library__name__in=keys).annotate(batch_key=F('library__name'))
+    found = {librarian.batch_key: librarian for librarian in librarians}
+    return {key: found.get(key) for key in keys}
+
+
 if __name__ == "__main__":
 
     import os
@@ -0,0 +1,35 @@
+"""
+Role checks for the role-gated views.
+
+The role comes from the user's UserProfile, which the authentication
+backend loads in the same query as the user, and permissions come from the
+cross-request permission cache (see ``bookshelf.backends``), so a warm
+role check runs no queries of its own.
+
+Profiles are not created along with users: import_users writes them in
+bulk, and any other user gets a member profile on the first role lookup.
+"""
+from django.contrib.auth.decorators import user_passes_test
+
+from bookshelf.models import UserProfile
+
+
+def get_role(user):
+    """The user's profile role, None for anonymous users"""
+    if not user.is_authenticated:
+        return None
+    try:
+        profile = user.userprofile
+    except UserProfile.DoesNotExist:
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        user.userprofile = profile
+    return profile.role
+
+
+def role_required(role, perms=(), login_url=None):
+    """
+    Let through users with ``role`` and all of ``perms``, send everyone
+    else to the login page. Replaces stacking ``user_passes_test`` and
+    ``permission_required``.
+    """
+    return user_passes_test(lambda user: get_role(user) == role and user.has_perms(perms), login_url=login_url)
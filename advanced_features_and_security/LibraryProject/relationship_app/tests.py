@@ -1,3 +1,205 @@
+from datetime import date
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from bookshelf.models import CustomUser, UserProfile
+from .models import Author, Book, Librarian, Library
+from . import query_samples
+
+
+class ListBooksCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name='Ursula K. Le Guin')
+        Book.objects.create(title='The Dispossessed', author=self.author)
+        self.url = reverse('list_books')
+
+    def test_entries_vary_on_permissions(self):
+        self.assertEqual(self.client.get(self.url, secure=True)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, secure=True)['X-Cache'], 'HIT')
+
+        librarian = CustomUser.objects.create_user(
+            username='librarian', email='librarian@test.com', password='librarianPass123',
+            date_of_birth=date(1990, 1, 1),
+        )
+        librarian.user_permissions.add(Permission.objects.get(codename='can_add_book'))
+        self.client.force_login(librarian)
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Add New Book')
+
+    def test_author_rename_purges_listing(self):
+        self.client.get(self.url, secure=True)
+        self.author.name = 'Ursula Le Guin'
+        self.author.save()
+        self.assertContains(self.client.get(self.url, secure=True), '>Ursula Le Guin</a>')
+
+
+class RoleViewsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book_perms = Permission.objects.filter(
+            codename__in=['can_add_book', 'can_change_book', 'can_delete_book']
+        )
+
+    def login(self, role, with_perms=False):
+        user = CustomUser.objects.create_user(
+            username=role, email=f'{role}@test.com', password=f'{role}Pass123',
+            date_of_birth=date(1990, 1, 1),
+        )
+        UserProfile.objects.create(user=user, role=role)
+        if with_perms:
+            user.user_permissions.set(self.book_perms)
+        self.client.force_login(user)
+
+    def test_query_counts(self):
+        for role, view_name, with_perms in [
+            ('admin', 'admin_view', True),
+            ('librarian', 'librarian_view', True),
+            ('member', 'member_view', False),
+        ]:
+            with self.subTest(role=role):
+                cache.clear()
+                self.login(role, with_perms)
+                url = reverse(view_name)
+                self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+                # Session, then user with profile; permissions come from the cache
+                with self.assertNumQueries(2):
+                    self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+
+    def test_profile_created_on_first_role_lookup(self):
+        user = CustomUser.objects.create_user(
+            username='newcomer', email='newcomer@test.com', password='newcomerPass123',
+            date_of_birth=date(1990, 1, 1),
+        )
+        self.assertFalse(UserProfile.objects.filter(user=user).exists())
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse('member_view'), secure=True).status_code, 200)
+        self.assertEqual(UserProfile.objects.get(user=user).role, 'member')
+        self.assertEqual(self.client.get(reverse('member_view'), secure=True).status_code, 200)
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+
+    def test_wrong_role_redirected(self):
+        self.login('member', with_perms=True)
+        for view_name in ('admin_view', 'librarian_view'):
+            self.assertEqual(self.client.get(reverse(view_name), secure=True).status_code, 302)
+
+    def test_role_without_permissions_redirected(self):
+        self.login('librarian')
+        self.assertEqual(self.client.get(reverse('librarian_view'), secure=True).status_code, 302)
+
+
+class CatalogQueryCountTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.authors = Author.objects.bulk_create([Author(name=f'Author {i}') for i in range(20)])
+        self.library = Library.objects.create(name='Central')
+
+    def grow_catalog(self, size):
+        count = Book.objects.count()
+        books = Book.objects.bulk_create([
+            Book(title=f'Book {i:05}', author=self.authors[i % len(self.authors)]) for i in range(count, size)
+        ])
+        self.library.books.add(*books)
+
+    def get(self, url, params=None, queries=0):
+        # Measure the views themselves, not the response cache
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_counts_independent_of_catalog_size(self):
+        list_url = reverse('list_books')
+        library_url = reverse('library_detail', kwargs={'pk': self.library.pk})
+        for size in (10, 1000, 10000):
+            with self.subTest(size=size):
+                self.grow_catalog(size)
+                # Count and page
+                response = self.get(list_url, queries=2)
+                self.assertEqual(len(response.context['books']), min(size, 50))
+                # Plus the author
+                self.get(list_url, {'author': self.authors[0].pk}, queries=3)
+                # Library, then books with their authors
+                response = self.get(library_url, queries=2)
+                self.assertEqual(response.context['books'].has_next(), size > 50)
+
+    def test_library_cursor_pages_cover_all_books(self):
+        self.grow_catalog(120)
+        url = reverse('library_detail', kwargs={'pk': self.library.pk})
+        seen, params = [], {}
+        while True:
+            page = self.get(url, params, queries=2).context['books']
+            seen.extend(book.pk for book in page)
+            if not page.has_next():
+                break
+            params = {'after': page.next_cursor}
+        self.assertEqual(seen, list(Book.objects.order_by('title', 'pk').values_list('pk', flat=True)))
+
+    def test_author_filter(self):
+        self.grow_catalog(40)
+        response = self.get(reverse('list_books'), {'author': self.authors[1].pk}, queries=3)
+        self.assertEqual({book.author_id for book in response.context['books']}, {self.authors[1].pk})
+        self.assertEqual(response.context['books'].paginator.count, 2)
+
+    def test_invalid_author_filter(self):
+        for author in ('abc', '0'):
+            with self.subTest(author=author):
+                self.assertEqual(self.client.get(reverse('list_books'), {'author': author}, secure=True).status_code, 404)
+
+
+class BatchedQuerySamplesTestCase(TestCase):
+    def setUp(self):
+        self.authors = Author.objects.bulk_create([Author(name=f'Author {i}') for i in range(4)])
+        self.books = Book.objects.bulk_create([
+            Book(title=f'Book {i}', author=self.authors[i % 3]) for i in range(9)
+        ])
+        self.libraries = Library.objects.bulk_create([Library(name=f'Library {i}') for i in range(3)])
+        self.libraries[0].books.add(*self.books[:5])
+        self.libraries[1].books.add(*self.books[3:])
+        Librarian.objects.create(name='Ada', library=self.libraries[0])
+
+    def pks(self, mapping):
+        return {key: sorted(book.pk for book in books) for key, books in mapping.items()}
+
+    def test_books_by_authors_match_single_lookups(self):
+        ids = [author.pk for author in self.authors] + [0]
+        names = [author.name for author in self.authors] + ['Nobody']
+        with self.assertNumQueries(1):
+            by_id = query_samples.get_books_by_authors(author_ids=ids)
+        with self.assertNumQueries(1):
+            by_name = query_samples.get_books_by_authors(author_names=names)
+        for author_id, name in zip(ids, names):
+            expected = sorted(book.pk for book in query_samples.get_books_by_author(author_id=author_id))
+            self.assertEqual(self.pks(by_id)[author_id], expected)
+            self.assertEqual(self.pks(by_name)[name], expected)
+        self.assertEqual(by_id[0], [])
+
+    def test_books_in_libraries_match_single_lookups(self):
+        ids = [library.pk for library in self.libraries]
+        names = [library.name for library in self.libraries]
+        with self.assertNumQueries(1):
+            by_id = query_samples.get_books_in_libraries(library_ids=ids)
+        with self.assertNumQueries(1):
+            by_name = query_samples.get_books_in_libraries(library_names=names)
+        for library_id, name in zip(ids, names):
+            expected = sorted(book.pk for book in query_samples.get_books_in_library(library_id=library_id))
+            self.assertEqual(self.pks(by_id)[library_id], expected)
+            self.assertEqual(self.pks(by_name)[name], expected)
+        self.assertEqual(len(by_id[self.libraries[0].pk]), 5)
+        self.assertEqual(by_id[self.libraries[2].pk], [])
+
+    def test_librarians_for_libraries(self):
+        names = [library.name for library in self.libraries]
+        with self.assertNumQueries(1):
+            librarians = query_samples.get_librarians_for_libraries(library_names=names)
+        self.assertEqual(librarians, {'Library 0': self.libraries[0].librarian, 'Library 1': None, 'Library 2': None})
 
-# Create your tests here.
+    def test_keys_required(self):
+        with self.assertRaises(ValueError):
+            query_samples.get_books_by_authors()
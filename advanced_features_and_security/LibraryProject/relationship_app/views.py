@@ -1,35 +1,59 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic.detail import DetailView
 from django.contrib.auth.forms import UserCreationForm
+from django.core.paginator import Paginator
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.contrib.auth import login, logout
-from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth.decorators import permission_required
 from django.contrib import messages
 from django import forms
-from .models import Library, Book
+from bookshelf.response_cache import cache_response
+from .models import Author, Library, Book
+from .pagination import paginate_keyset
+from .roles import get_role, role_required
 
 # Custom user creation moved to bookshelf app
 
+BOOKS_PER_PAGE = 50
+
 # Function-based view to list all books
+@cache_response(tags=['catalog'], stale_while_revalidate=60)
 def list_books(request):
     """
-    Function-based view that lists all books in the database.
-    Renders a template with book titles and their authors.
+    Function-based view that lists all books in the database, a page at a time.
+    Renders a template with book titles and their authors; ``?author=<id>``
+    narrows the list to one author.
     """
-    books = Book.objects.all()
-    return render(request, 'relationship_app/list_books.html', {'books': books})
+    books = Book.objects.select_related('author').order_by('title', 'pk')
+    author = None
+    if request.GET.get('author'):
+        try:
+            author_id = int(request.GET['author'])
+        except ValueError:
+            raise Http404('Invalid author')
+        author = get_object_or_404(Author, pk=author_id)
+        books = books.filter(author=author)
+    page = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'relationship_app/list_books.html', {'books': page, 'page_obj': page, 'author': author})
 
 # Class-based view to display library details
 class LibraryDetailView(DetailView):
     """
     Class-based view that displays details for a specific library,
-    including all books available in that library.
+    including the books available in that library, a keyset page at a time
+    (``?after=<cursor>``).
     """
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        books = self.object.books.select_related('author')
+        context['books'] = paginate_keyset(books, 'title', BOOKS_PER_PAGE, self.request.GET.get('after'))
+        return context
+
 def register(request):
     success_url = reverse_lazy("login")
     template_name = "relationship_app/register.html"
@@ -46,13 +70,13 @@ def register(request):
     return render(request, template_name, {'form': form})
 
 def is_admin(user):
-    return user.is_authenticated and hasattr(user, 'userprofile') and user.userprofile.role == 'admin'
+    return get_role(user) == 'admin'
 
 def is_librarian(user):
-    return user.is_authenticated and hasattr(user, 'userprofile') and user.userprofile.role == 'librarian'
+    return get_role(user) == 'librarian'
 
 def is_member(user):
-    return user.is_authenticated and hasattr(user, 'userprofile') and user.userprofile.role == 'member'
+    return get_role(user) == 'member'
 
 class BookForm(forms.ModelForm):
     class Meta:
@@ -63,19 +87,23 @@ class BookForm(forms.ModelForm):
             'author': forms.Select(attrs={'class': 'form-control'}),
         }
 
-@user_passes_test(is_admin)
-@permission_required(['can_add_book', 'can_change_book', 'can_delete_book'])
+BOOK_MANAGEMENT_PERMS = [
+    'relationship_app.can_add_book',
+    'relationship_app.can_change_book',
+    'relationship_app.can_delete_book',
+]
+
+@role_required('admin', BOOK_MANAGEMENT_PERMS)
 def admin_view(request):
     template_name = "relationship_app/admin_view.html"
     return render(request, template_name)
 
-@user_passes_test(is_librarian)
-@permission_required(['can_add_book', 'can_change_book', 'can_delete_book'])
+@role_required('librarian', BOOK_MANAGEMENT_PERMS)
 def librarian_view(request):
     template_name = "relationship_app/librarian_view.html"
     return render(request, template_name)
 
-@user_passes_test(is_member)
+@role_required('member')
 def member_view(request):
     template_name = "relationship_app/member_view.html"
     return render(request, template_name)
@@ -1,18 +1,18 @@
 from django.shortcuts import render
 from rest_framework import generics
 from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
 
 from .models import Book
 from .serializers import BookSerializer
+from .authentication import CachingTokenAuthentication
 
 class BookList(generics.ListAPIView):
     pass
 
 class BookViewSet(viewsets.ModelViewSet):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachingTokenAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = Book.objects.all()
     serializer_class = BookSerializer
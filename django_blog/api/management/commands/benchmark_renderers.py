@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from api.serializers import PostSerializer
+from blog.models import Post
+from blog.tags import sync_post_tags
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON rendering throughput of the stock renderer and the orjson one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=500, help='Posts in the rendered payload')
+        parser.add_argument('--content-size', type=int, default=2000, help='Characters of content per post')
+        parser.add_argument('--rounds', type=int, default=50, help='Renders per renderer')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_renderer_author')
+            content = ('Lorem ipsum dolor sit amét, “quoted” ✓ ' * (options['content_size'] // 40 + 1))[:options['content_size']]
+            posts = Post.objects.bulk_create(
+                Post(title=f'Post {i}', content=content, author=author) for i in range(options['posts'])
+            )
+            for i, post in enumerate(posts):
+                sync_post_tags(post, ['django', f'topic-{i % 20}'])
+
+            queryset = Post.objects.select_related('author').prefetch_related('tags')
+            data = PostSerializer(queryset, many=True).data
+
+            results = {}
+            for label, renderer in [('JSONRenderer', JSONRenderer()), ('ORJSONRenderer', ORJSONRenderer())]:
+                start = time.perf_counter()
+                for _ in range(options['rounds']):
+                    rendered = renderer.render(data)
+                elapsed = time.perf_counter() - start
+                results[label] = rendered
+                self.stdout.write(
+                    f'{label:<16} {options["rounds"] / elapsed:8.1f} renders/s  '
+                    f'{len(rendered) * options["rounds"] / elapsed / 2**20:8.1f} MiB/s'
+                )
+
+            if results['JSONRenderer'] != results['ORJSONRenderer']:
+                self.stderr.write('Renderers produced different output')
+
+            transaction.set_rollback(True)
@@ -0,0 +1,60 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.views import PostListView
+from blog.models import Post
+
+
+class PostList(PostListView):
+    # The whole table in one response, to make the column cost visible
+    authentication_classes = []
+    pagination_class = None
+
+
+class Command(BaseCommand):
+    help = 'Compare a post list with every field against sparse fieldsets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Number of posts to list')
+        parser.add_argument('--content-size', type=int, default=20000, help='Characters of content per post')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_sparse_author')
+            content = ('Lorem ipsum dolor sit amet. ' * (options['content_size'] // 28 + 1))[:options['content_size']]
+            Post.objects.bulk_create(
+                Post(title=f'Post {i}', content=content, author=author) for i in range(options['posts'])
+            )
+
+            factory = APIRequestFactory()
+            view = PostList.as_view()
+            scenarios = [
+                ('all fields', {}),
+                ('?exclude=content', {'exclude': 'content'}),
+                ('?fields=id,title,published_date', {'fields': 'id,title,published_date'}),
+            ]
+            for label, params in scenarios:
+                start = time.perf_counter()
+                for _ in range(options['requests']):
+                    response = view(factory.get('/posts/', params)).render()
+                elapsed = (time.perf_counter() - start) / options['requests']
+
+                with CaptureQueriesContext(connection) as queries:
+                    view(factory.get('/posts/', params)).render()
+                post_query = next(q['sql'] for q in queries if 'FROM "blog_post"' in q['sql'])
+                columns = post_query.split(' FROM ')[0].count('"blog_post"')
+
+                self.stdout.write(
+                    f'{label:<34} {elapsed * 1000:8.1f} ms/request  '
+                    f'{len(response.content) / 2**20:6.2f} MiB  {columns} post columns  {len(queries)} queries'
+                )
+
+            transaction.set_rollback(True)
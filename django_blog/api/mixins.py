@@ -0,0 +1,171 @@
+"""
+Mixins for the blog API views and serializers.
+
+The sparse fieldset mixins are a copy of the ones in advanced-api-project's
+``api.mixins``: the projects are deployed separately and share no package,
+so a fix to the common part has to be made in both. This copy additionally
+drops the relations only omitted fields would use (``drop_relations``).
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from blog.cache import get_post_version, get_posts_version
+
+
+def _split_names(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Limits a serializer's output to ``?fields=a,b`` and/or ``?exclude=c``.
+
+    Only applies to the top-level serializer of a GET request, so nested
+    serializers and writes always see every field. Unknown names are a 400.
+    The fields left out are kept in ``omitted_fields``.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        self.omitted_fields = {}
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_top_level():
+            return fields
+
+        requested = _split_names(request.query_params.get('fields', ''))
+        excluded = _split_names(request.query_params.get('exclude', ''))
+        unknown = sorted(set(requested + excluded) - set(fields))
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field: {name}" for name in unknown]})
+
+        for name in list(fields):
+            if (requested and name not in requested) or name in excluded:
+                self.omitted_fields[name] = fields.pop(name)
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+
+class SparseFieldsetMixin:
+    """
+    Loads only the columns the (sparse) serializer renders.
+
+    When every rendered field maps to a model column the queryset uses
+    ``only()``; otherwise (method fields, properties) the columns of the
+    omitted fields are ``defer()``-ed. Ordering, pagination and
+    select_related columns are always loaded, and relations used only by
+    omitted fields are neither joined nor prefetched.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.project_queryset(queryset)
+
+    def project_queryset(self, queryset):
+        serializer = self.get_serializer()
+        rendered = serializer.fields
+        if not serializer.omitted_fields or queryset.query.select_related is True:
+            return queryset
+
+        # Omitted fields were never bound, so their source is read by hand
+        used = {self.source_root(name, field) for name, field in rendered.items()}
+        unused = {self.source_root(name, field)
+                  for name, field in serializer.omitted_fields.items()} - used
+        queryset = self.drop_relations(queryset, unused)
+
+        opts = queryset.model._meta
+        columns = {f.name for f in opts.concrete_fields}
+
+        def column(name, field):
+            # The model column behind a field, '' for relations without one
+            # and None when the source is not a model field
+            try:
+                model_field = opts.get_field(self.source_root(name, field))
+            except FieldDoesNotExist:
+                return None
+            return model_field.name if model_field.name in columns else ''
+
+        needed = {column(name, field) for name, field in rendered.items()}
+        if None in needed:
+            omitted = {column(name, field) for name, field in serializer.omitted_fields.items()}
+            return queryset.defer(*(omitted - {None, ''}))
+
+        ordering = ()
+        if hasattr(self.paginator, 'get_ordering'):
+            # Cursor pagination reads its position from these columns
+            ordering = self.paginator.get_ordering(self.request, queryset, self)
+        for name in (*queryset.query.order_by, *ordering):
+            needed.add(name.lstrip('-'))
+        if isinstance(queryset.query.select_related, dict):
+            needed.update(queryset.query.select_related)
+        needed.add(opts.pk.name)
+        return queryset.only(*(needed & columns))
+
+    @staticmethod
+    def source_root(name, field):
+        """First attribute of a field's source, '*' for whole-object fields"""
+        return (field.source or name).split('.')[0]
+
+    @staticmethod
+    def drop_relations(queryset, names):
+        """Remove select_related/prefetch_related lookups starting with ``names``"""
+        lookups = queryset._prefetch_related_lookups
+        kept = [lookup for lookup in lookups
+                if getattr(lookup, 'prefetch_through', lookup).split(LOOKUP_SEP)[0] not in names]
+        if len(kept) < len(lookups):
+            queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+
+        def paths(tree, prefix=''):
+            for name, subtree in tree.items():
+                yield from paths(subtree, f'{prefix}{name}{LOOKUP_SEP}') if subtree else [prefix + name]
+
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict) and names & set(select_related):
+            kept = [path for path in paths(select_related) if path.split(LOOKUP_SEP)[0] not in names]
+            queryset = queryset.select_related(None)
+            if kept:
+                queryset = queryset.select_related(*kept)
+        return queryset
+
+
+class VersionETagMixin:
+    """
+    ETags from the blog's cache versions (see ``blog.cache``).
+
+    The versions are bumped by the blog's signal handlers on every change,
+    so checking ``If-None-Match`` costs a cache lookup and no query, and a
+    304 is returned before the view touches the database. This relies on
+    the versions being kept in a cache shared by all workers.
+
+    ``etag_scope`` picks the version: ``'posts'`` for views over the whole
+    collection, ``'post'`` for views of the post in the ``pk`` URL kwarg.
+    """
+    etag_scope = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.etag_scope not in ('posts', 'post'):
+            raise ImproperlyConfigured(f"{cls.__name__}.etag_scope must be 'posts' or 'post'")
+
+    def get_etag_version(self):
+        if self.etag_scope == 'post':
+            return get_post_version(self.kwargs['pk'])
+        return get_posts_version()
+
+    def get(self, request, *args, **kwargs):
+        # Browsable API and JSON representations get different tags
+        etag = quote_etag(f'{self.get_etag_version()}-{request.accepted_renderer.format}')
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PostCursorPagination(CursorPagination):
+    """Newest posts first, walking the (published_date, id) index"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-published_date', '-id')
+
+
+class CommentCursorPagination(CursorPagination):
+    """Newest comments first, walking the (post, created_at, id) index"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class TagCursorPagination(CursorPagination):
+    """Most used tags first"""
+    page_size = 100
+    ordering = ('-post_count', 'name')
@@ -0,0 +1,24 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, producing the same compact UTF-8 output.
+
+    Falls back to the stock encoder when orjson is not installed or when the
+    client asks for indented output (``Accept: application/json; indent=4``).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        # The DRF encoder handles what orjson does not (Decimal, lazy strings...)
+        return orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,8 +1,51 @@
 from rest_framework import serializers
+from taggit.models import Tag
 
-from blog.models import Post
+from blog.models import Comment, Post
+from .mixins import SparseFieldsetSerializerMixin
+
+class TagNamesField(serializers.Field):
+    """
+    Names of a post's tags.
+
+    Reads the list left by ``Prefetch('tags', to_attr='prefetched_tags')``
+    when the view made one: prefetching into taggit's manager instead
+    builds a queryset per post, which costs more than the query itself.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        tags = getattr(instance, 'prefetched_tags', None)
+        return tags if tags is not None else instance.tags.all()
+
+    def to_representation(self, tags):
+        return [tag.name for tag in tags]
+
+class PostSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Serializes posts; GET requests can pick fields with ?fields=/?exclude="""
+    # Read from select_related('author') and the prefetched tags
+    author = serializers.CharField(source='author.username', read_only=True)
+    tags = TagNamesField()
 
-class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
-        fields = '__all__'
\ No newline at end of file
+        fields = ['id', 'title', 'content', 'published_date', 'author', 'tags']
+
+class CommentSerializer(serializers.ModelSerializer):
+    """Serializes comments with their author's username"""
+    author = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'post', 'author', 'content', 'created_at', 'updated_at']
+
+class TagSerializer(serializers.ModelSerializer):
+    """Serializes tags with their post count from TagStats"""
+    post_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Tag
+        fields = ['name', 'slug', 'post_count']
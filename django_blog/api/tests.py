@@ -1,3 +1,131 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from blog.models import Comment, Post
+from blog.tags import sync_post_tags
+from .mixins import VersionETagMixin
+from .renderers import ORJSONRenderer
+
+
+class PostAPITestCase(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='alicePass')
+        self.bob = User.objects.create_user(username='bob', password='bobPass')
+        self.posts = []
+        for i in range(6):
+            post = Post.objects.create(title=f'Post {i}', content='x' * 1000, author=self.alice if i % 2 else self.bob)
+            sync_post_tags(post, ['django', f'topic-{i}'])
+            self.posts.append(post)
+
+    def test_list_query_count(self):
+        # Posts with their authors, then the tags of the page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('api:post_list'))
+        results = response.json()['results']
+        self.assertEqual([post['title'] for post in results], [f'Post {i}' for i in reversed(range(6))])
+        self.assertEqual(results[0]['author'], 'alice')
+        self.assertEqual(sorted(results[0]['tags']), ['django', 'topic-5'])
+
+    def test_cursor_pagination(self):
+        response = self.client.get(reverse('api:post_list'), {'page_size': 4})
+        first = response.json()
+        self.assertEqual(len(first['results']), 4)
+        second = self.client.get(first['next']).json()
+        self.assertEqual([post['title'] for post in second['results']], ['Post 1', 'Post 0'])
+        self.assertIsNone(second['next'])
+
+    def test_tag_filter(self):
+        response = self.client.get(reverse('api:post_list'), {'tag': 'topic-3'})
+        self.assertEqual([post['title'] for post in response.json()['results']], ['Post 3'])
+
+    def test_list_etag(self):
+        url = reverse('api:post_list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Comments only change their post's tag, listings stay current
+        Comment.objects.create(post=self.posts[0], author=self.alice, content='Nice')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.posts[0].title = 'Changed'
+        self.posts[0].save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_scope_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type('UnscopedView', (VersionETagMixin, generics.ListAPIView), {})
+
+    def test_detail(self):
+        url = reverse('api:post_detail', kwargs={'pk': self.posts[2].pk})
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['title'], 'Post 2')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # Other posts changing does not touch this post's tag
+        self.posts[3].title = 'Changed'
+        self.posts[3].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        self.assertEqual(self.client.get(reverse('api:post_detail', kwargs={'pk': 4242})).status_code, 404)
+
+    def test_comments(self):
+        post = self.posts[0]
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.alice if i % 2 else self.bob, content=f'Comment {i}') for i in range(5)
+        )
+        url = reverse('api:post_comments', kwargs={'pk': post.pk})
+        # The post lookup, then the comments with their authors
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), 5)
+        self.assertIn(response.json()['results'][0]['author'], ['alice', 'bob'])
+        self.assertEqual(self.client.get(reverse('api:post_comments', kwargs={'pk': 4242})).status_code, 404)
+
+    def test_tags(self):
+        response = self.client.get(reverse('api:tag_list'))
+        tags = response.json()['results']
+        self.assertEqual(tags[0], {'name': 'django', 'slug': 'django', 'post_count': 6})
+        self.assertEqual(len(tags), 7)
+
+    def test_fields_skips_content_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:post_list'), {'fields': 'id,title'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+        self.assertNotIn('"content"', queries[0]['sql'])
+        # Neither the author join nor the tags prefetch is needed
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_exclude(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:post_list'), {'exclude': 'content'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title', 'published_date', 'author', 'tags'})
+        self.assertNotIn('"content"', queries[0]['sql'])
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('api:post_list'), {'fields': 'body'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ORJSONRendererTestCase(APITestCase):
+    def test_matches_stock_renderer(self):
+        data = {'title': 'Café', 'tags': ['a', 'b'], 'count': 3, 'nested': {'ok': True, 'none': None}}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(json.loads(rendered), {'a': 1})
+        self.assertIn(b'\n', rendered)
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from .views import CommentListView, PostDetailView, PostListView, TagListView
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', PostListView.as_view(), name='post_list'),
+    path('posts/<int:pk>/', PostDetailView.as_view(), name='post_detail'),
+    path('posts/<int:pk>/comments/', CommentListView.as_view(), name='post_comments'),
+    path('tags/', TagListView.as_view(), name='tag_list'),
+]
@@ -1,34 +1,62 @@
-# from django.shortcuts import render
-# from rest_framework import generics
-# from rest_framework.permissions import IsAuthenticated, IsAdminUser
-
-# from blog.models import Post
-# from .serializers import PostSerializer
-
-# class ListView(generics.ListAPIView):
-#     """display all blog posts"""
-#     queryset = Post.objects.all()
-#     serializer_class = PostSerializer
-
-# class DetailView(generics.ListAPIView):
-#     """show individual blog posts"""
-#     queryset = Post.objects.all()
-#     serializer_class = PostSerializer
-
-# class CreateView(generics.CreateAPIView):
-#     """allow authenticated users to create new posts"""
-#     queryset = Post.objects.all()
-#     serializer_class = PostSerializer
-#     permission_classes = [IsAuthenticated]
-
-# class UpdateView(generics.UpdateAPIView):
-#     """enable post authors to edit their posts."""
-#     queryset = Post.objects.all()
-#     serializer_class = PostSerializer
-#     permission_classes = [IsAuthenticated]
-
-# class DeleteView(generics.DestroyAPIView):
-#     queryset = Post.objects.all()
-#     serializer_class = PostSerializer
-#     permission_classes = [IsAuthenticated, IsAdminUser]
+from django.db.models import F, Prefetch
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from rest_framework import generics
+from taggit.models import Tag
 
+from blog.models import Comment, Post
+from blog.response_cache import cache_response
+from .mixins import SparseFieldsetMixin, VersionETagMixin
+from .pagination import CommentCursorPagination, PostCursorPagination, TagCursorPagination
+from .serializers import CommentSerializer, PostSerializer, TagSerializer
+
+def post_queryset():
+    """Posts with everything PostSerializer renders loaded up front"""
+    return Post.objects.select_related('author').prefetch_related(
+        Prefetch('tags', to_attr='prefetched_tags')
+    )
+
+@method_decorator(cache_response(tags=['posts']), name='list')
+class PostListView(VersionETagMixin, SparseFieldsetMixin, generics.ListAPIView):
+    """List posts, newest first; ``?tag=<slug>`` narrows to one tag"""
+    etag_scope = 'posts'
+    serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
+
+    def get_queryset(self):
+        queryset = post_queryset()
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = queryset.filter(tags__slug=tag)
+        return queryset
+
+@method_decorator(cache_response(tags=['post:{pk}']), name='retrieve')
+class PostDetailView(VersionETagMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
+    """Show a single post"""
+    etag_scope = 'post'
+    serializer_class = PostSerializer
+
+    def get_queryset(self):
+        return post_queryset()
+
+@method_decorator(cache_response(tags=['post:{pk}']), name='list')
+class CommentListView(VersionETagMixin, generics.ListAPIView):
+    """List a post's comments, newest first"""
+    etag_scope = 'post'
+    serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
+
+    def get_queryset(self):
+        post = get_object_or_404(Post.objects.only('pk'), pk=self.kwargs['pk'])
+        return Comment.objects.filter(post=post).select_related('author')
+
+@method_decorator(cache_response(tags=['tags']), name='list')
+class TagListView(VersionETagMixin, generics.ListAPIView):
+    """List tags in use, most used first"""
+    etag_scope = 'posts'
+    serializer_class = TagSerializer
+    pagination_class = TagCursorPagination
+
+    def get_queryset(self):
+        # post_count is read from the denormalized TagStats row
+        return Tag.objects.filter(stats__post_count__gt=0).annotate(post_count=F('stats__post_count'))
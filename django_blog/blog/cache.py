@@ -0,0 +1,54 @@
+"""
+Versioned cache keys for post detail pages.
+
+Every post has a version number stored in the cache. Rendered pages and
+template fragments include the version in their key, so bumping it (on
+any change to the post or its comments) makes all of them unreachable at
+once without having to know which keys exist. A collection-wide version,
+bumped along with every post but not by comments, covers listings.
+
+The versions live in the ``POST_VERSION_CACHE_ALIAS`` cache, which has to
+be shared by all worker processes: a version bumped in one process only
+is never seen by the others, which then serve stale pages and 304s.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from blog.versions import bump_version, get_version
+
+POST_CACHE_TIMEOUT = getattr(settings, 'POST_CACHE_TIMEOUT', 60 * 15)
+
+POSTS_VERSION_KEY = 'blog:posts:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'POST_VERSION_CACHE_ALIAS', 'default')]
+
+
+def _version_key(post_id):
+    return f'blog:post:{post_id}:version'
+
+
+def get_post_version(post_id):
+    """Return the current cache version of a post"""
+    return get_version(_cache(), _version_key(post_id))
+
+
+def get_posts_version():
+    """Return the version of post listings, which changes with any post"""
+    return get_version(_cache(), POSTS_VERSION_KEY)
+
+
+def bump_post_version(post_id):
+    """Invalidate every cached page and fragment of a post"""
+    bump_version(_cache(), _version_key(post_id))
+
+
+def bump_posts_version():
+    """Invalidate the listings, after a post was added, changed or removed"""
+    bump_version(_cache(), POSTS_VERSION_KEY)
+
+
+def post_page_key(post_id, version):
+    """Cache key of the fully rendered page served to anonymous readers"""
+    return f'blog:post:{post_id}:v{version}:page'
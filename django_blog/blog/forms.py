@@ -2,9 +2,9 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from taggit.forms import TagWidget
-from taggit.models import Tag
 
 from blog.models import Post, Comment
+from blog.tags import sync_post_tags
 
 class RegistrationForm(UserCreationForm):
     username = forms.CharField(max_length=100)
@@ -56,20 +56,19 @@ class PostForm(forms.ModelForm):
             )
 
     def save(self, commit=True):
-        post = super().save(commit=commit)
-        
+        post = super().save(commit=False)
+
         if commit:
-            # Clear existing tags and add new ones
-            post.tags.clear()
-            tags_input = self.cleaned_data.get('tags', '')
-            
-            if tags_input:
-                tag_names = [name.strip().lower() for name in tags_input.split(',') if name.strip()]
-                for tag_name in tag_names:
-                    tag, created = Tag.objects.get_or_create(name=tag_name)
-                    post.tags.add(tag)
-        
+            post.save()
+            self.save_tags(post)
+        else:
+            self.save_m2m = lambda: self.save_tags(post)
+
         return post
+
+    def save_tags(self, post):
+        """Sync the post's tags with the submitted ones in bulk"""
+        sync_post_tags(post, self.cleaned_data.get('tags') or [])
         
 class CommentForm(forms.ModelForm):
     """Form for creating and updating comments"""
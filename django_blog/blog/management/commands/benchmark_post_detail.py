@@ -0,0 +1,56 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Post, Comment
+
+
+class Command(BaseCommand):
+    help = 'Measure post detail requests/sec with a cold and a warm cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=200, help='Comments on the benchmark post')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_post_author')
+            post = Post.objects.create(title='Benchmark post', content='Lorem ipsum ' * 500, author=author)
+            post.tags.add('benchmark', 'cache')
+            Comment.objects.bulk_create([
+                Comment(post=post, author=author, content=f'Comment {i}')
+                for i in range(options['comments'])
+            ])
+            url = reverse('blog:post_detail', kwargs={'pk': post.pk})
+
+            anonymous = Client(HTTP_HOST='localhost')
+            logged_in = Client(HTTP_HOST='localhost')
+            logged_in.force_login(author)
+
+            for label, client in [('anonymous', anonymous), ('logged in', logged_in)]:
+                cold = self.measure(client, url, options['requests'], clear_cache=True)
+                warm = self.measure(client, url, options['requests'], clear_cache=False)
+                self.stdout.write(
+                    f'{label:10} cold: {cold:8.1f} req/s   warm: {warm:8.1f} req/s'
+                    f'   speedup: {warm / cold:5.1f}x'
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, count, clear_cache):
+        client.get(url)  # prime the session and, for warm runs, the cache
+        elapsed = 0.0
+        for _ in range(count):
+            if clear_cache:
+                # Sessions live in the database, so this only drops cached pages
+                cache.clear()
+            start = time.perf_counter()
+            client.get(url)
+            elapsed += time.perf_counter() - start
+        return count / elapsed
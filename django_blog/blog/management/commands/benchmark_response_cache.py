@@ -0,0 +1,73 @@
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Post, Comment
+from blog.tags import sync_post_tags
+
+BACKENDS = {
+    'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'},
+    'file': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache'},
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure list/detail requests/sec with and without the response cache, per cache backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200, help='Posts to create')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_cache_author')
+            posts = Post.objects.bulk_create([
+                Post(title=f'Benchmark post {i}', content='Lorem ipsum ' * 100, author=author)
+                for i in range(options['posts'])
+            ])
+            for i, post in enumerate(posts):
+                sync_post_tags(post, ['benchmark', f'topic-{i % 10}'])
+            Comment.objects.bulk_create([
+                Comment(post=posts[0], author=author, content=f'Comment {i}') for i in range(50)
+            ])
+            urls = {
+                'blog:posts': reverse('blog:posts'),
+                'blog:tag_cloud': reverse('blog:tag_cloud'),
+                'blog:tag_stats': reverse('blog:tag_stats'),
+                'api:post_list': reverse('api:post_list'),
+                'api:post_detail': reverse('api:post_detail', kwargs={'pk': posts[0].pk}),
+                'api:post_comments': reverse('api:post_comments', kwargs={'pk': posts[0].pk}),
+            }
+
+            client = Client(HTTP_HOST='localhost')
+            for backend, config in BACKENDS.items():
+                with tempfile.TemporaryDirectory() as location, \
+                        override_settings(CACHES={'default': {'LOCATION': location, **config}}):
+                    self.stdout.write(f'{backend} backend')
+                    for name, url in urls.items():
+                        uncached = self.measure(client, url, options['requests'], clear_cache=True)
+                        cached = self.measure(client, url, options['requests'], clear_cache=False)
+                        self.stdout.write(
+                            f'  {name:18} uncached: {uncached:8.1f} req/s   cached: {cached:8.1f} req/s'
+                            f'   speedup: {cached / uncached:5.1f}x'
+                        )
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, count, clear_cache):
+        client.get(url)  # prime the cache for cached runs
+        elapsed = 0.0
+        for _ in range(count):
+            if clear_cache:
+                caches['default'].clear()
+            start = time.perf_counter()
+            client.get(url)
+            elapsed += time.perf_counter() - start
+        return count / elapsed
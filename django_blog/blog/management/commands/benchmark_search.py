@@ -0,0 +1,84 @@
+import random
+import statistics
+import string
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from blog.models import Post
+from blog.search import rebuild_index, search_posts, tokenize
+
+VOCABULARY_SIZE = 20000
+
+
+class Command(BaseCommand):
+    help = 'Compare search latency of the inverted index against the icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000, help='Number of synthetic posts')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic posts never reach the real database.
+        with transaction.atomic():
+            vocabulary = self.populate(options['posts'])
+            # A common, a mid-frequency and a rare term, plus a two-term query
+            queries = [vocabulary[10], vocabulary[500], vocabulary[5000],
+                       f'{vocabulary[10]} {vocabulary[500]}']
+            for query in queries:
+                legacy = self.measure(lambda: self.icontains_search(query), options['repeat'])
+                indexed = self.measure(lambda: list(search_posts(query)[:10]), options['repeat'])
+                self.stdout.write(
+                    f'{query!r:24} icontains: {legacy:8.2f} ms   index: {indexed:8.2f} ms'
+                    f'   speedup: {legacy / indexed:6.1f}x'
+                )
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        self.stdout.write(f'Creating {count} synthetic posts...')
+        rng = random.Random(42)
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        # Zipf-like word frequencies, like natural language
+        frequencies = [1 / rank for rank in range(1, VOCABULARY_SIZE + 1)]
+
+        def words(k):
+            return ' '.join(rng.choices(vocabulary, weights=frequencies, k=k))
+
+        author = User.objects.create_user(username='benchmark_search_author')
+        Post.objects.bulk_create([
+            Post(
+                title=words(6),
+                content=words(300),
+                author=author,
+            )
+            for _ in range(count)
+        ], batch_size=500)
+        rebuild_index()
+        return vocabulary
+
+    def icontains_search(self, query):
+        # Same semantics as search_posts: every term must occur in the title,
+        # the content or a tag (as a substring here, as a whole term there)
+        posts = Post.objects.all()
+        for term in set(tokenize(query)):
+            posts = posts.filter(
+                Q(title__icontains=term) |
+                Q(content__icontains=term) |
+                Q(pk__in=Post.objects.filter(tags__name__icontains=term).values('pk'))
+            )
+        return list(posts.order_by('-published_date')[:10])
+
+    def measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,58 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from taggit.models import Tag
+
+from blog.models import Post
+from blog.tags import sync_post_tags
+
+
+class Command(BaseCommand):
+    help = 'Compare per-tag get_or_create against bulk tag sync for 1, 10 and 50 tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help='Saves per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the synthetic data never reaches the real database.
+        with transaction.atomic():
+            author = User.objects.create_user(username='benchmark_tag_author')
+            post = Post.objects.create(title='Benchmark post', content='Body', author=author)
+
+            for tag_count in (1, 10, 50):
+                # Alternate between two tag sets so every save changes every tag
+                tag_sets = [
+                    [f'bench-{tag_count}-{variant}-{i}' for i in range(tag_count)]
+                    for variant in ('a', 'b')
+                ]
+                legacy = self.measure(lambda names: self.legacy_sync(post, names), tag_sets, options['repeat'])
+                bulk = self.measure(lambda names: sync_post_tags(post, names), tag_sets, options['repeat'])
+                self.stdout.write(
+                    f'{tag_count:3} tags   legacy: {legacy[0]:7.2f} ms ({legacy[1]:3} queries)'
+                    f'   bulk: {bulk[0]:7.2f} ms ({bulk[1]:3} queries)'
+                )
+            transaction.set_rollback(True)
+
+    def legacy_sync(self, post, names):
+        """The previous PostForm.save behaviour"""
+        post.tags.clear()
+        for name in names:
+            tag, created = Tag.objects.get_or_create(name=name)
+            post.tags.add(tag)
+
+    def measure(self, func, tag_sets, repeat):
+        func(tag_sets[1])
+        timings = []
+        for i in range(repeat):
+            names = tag_sets[i % 2]
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                func(names)
+                timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), len(queries)
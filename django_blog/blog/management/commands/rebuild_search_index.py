@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the blog post search index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of posts to index per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding search index...')
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} posts'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.tags import rebuild_tag_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized tag post counters from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of tags to recount per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding tag stats...')
+        rebuilt = rebuild_tag_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recounted {rebuilt} tags'))
@@ -1,6 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
 from taggit.managers import TaggableManager
+from taggit.models import Tag
+
+from blog.cache import bump_post_version, bump_posts_version
+from blog.response_cache import purge
 
 class Post(models.Model):
     title = models.CharField(max_length=200)
@@ -8,6 +14,12 @@ class Post(models.Model):
     published_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = TaggableManager(blank=True)
+
+    class Meta:
+        indexes = [
+            # Matches the (published_date, id) keyset used by PostListView
+            models.Index(fields=['-published_date', '-id'], name='post_published_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -21,6 +33,83 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the per-post (created_at, id) keyset used for comment pages
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Comment by {self.author.username} on {self.post.title}'
+
+
+class SearchTerm(models.Model):
+    """One row of the inverted search index: a term and its weight in a post"""
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'post'], name='unique_search_term_per_post'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} -> {self.post_id} ({self.weight})'
+
+
+class TagStats(models.Model):
+    """Materialized per-tag counters, kept up to date by blog.tags"""
+    tag = models.OneToOneField(Tag, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    post_count = models.PositiveIntegerField(default=0)
+    last_post_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-post_count'], name='tagstats_post_count_idx'),
+        ]
 
     def __str__(self):
-        return f'Comment by {self.author.username} on {self.post.title}'
\ No newline at end of file
+        return f'{self.tag} ({self.post_count})'
+
+
+# Signal handlers keeping the search index in sync with posts and their tags.
+# Deleting a post removes its terms through the SearchTerm cascade.
+@receiver(post_save, sender=Post)
+def index_post_on_save(sender, instance, **kwargs):
+    from blog.search import index_post
+    index_post(instance)
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_on_tag_change(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Post):
+        from blog.search import index_post
+        index_post(instance)
+
+
+# Signal handlers invalidating cached post detail pages and responses
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    bump_post_version(instance.pk)
+    bump_posts_version()
+    purge(f'post:{instance.pk}', 'posts', 'tags')
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_cache_on_tag_change(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Post):
+        bump_post_version(instance.pk)
+        bump_posts_version()
+        purge(f'post:{instance.pk}', 'posts', 'tags')
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_cache_on_comment(sender, instance, **kwargs):
+    bump_post_version(instance.post_id)
+    purge(f'post:{instance.post_id}')
+
+
+# Signal handler keeping tag counters in sync when a post goes away
+@receiver(pre_delete, sender=Post)
+def update_tag_stats_on_delete(sender, instance, **kwargs):
+    from blog.tags import remove_post_from_tag_stats
+    remove_post_from_tag_stats(instance)
@@ -0,0 +1,110 @@
+"""
+Inverted-index search for blog posts.
+
+Posts are tokenized into lowercase terms and stored in the ``SearchTerm``
+table together with a weight, so a search becomes an indexed lookup on
+``term`` followed by a grouped ``SUM(weight)`` instead of a
+``LIKE '%query%'`` scan over every post, its content and its tags.
+
+Matching is on whole terms: ``djan`` no longer finds posts about
+``django``, and a query is no longer matched as one substring but as a set
+of terms that must all be present.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from blog.models import Post, SearchTerm
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+
+# How much a single occurrence of a term counts towards a post's rank
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 5
+CONTENT_WEIGHT = 1
+
+
+def tokenize(text):
+    """Split text into lowercase index terms"""
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if MIN_TERM_LENGTH <= len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def build_terms(post, tag_names=None):
+    """Return a Counter mapping each term in the post to its weight"""
+    if tag_names is None:
+        tag_names = post.tags.names()
+
+    weights = Counter()
+    for term in tokenize(post.title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(post.content):
+        weights[term] += CONTENT_WEIGHT
+    for name in tag_names:
+        for term in tokenize(name):
+            weights[term] += TAG_WEIGHT
+    return weights
+
+
+def index_post(post, tag_names=None):
+    """(Re)build the index rows for a single post"""
+    weights = build_terms(post, tag_names)
+    with transaction.atomic():
+        SearchTerm.objects.filter(post=post).delete()
+        SearchTerm.objects.bulk_create([
+            SearchTerm(term=term, post=post, weight=weight)
+            for term, weight in weights.items()
+        ])
+
+
+def rebuild_index(batch_size=500):
+    """Rebuild the whole index from Post and taggit data, one batch at a time"""
+    SearchTerm.objects.all().delete()
+    indexed = 0
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .prefetch_related('tags')[:batch_size]
+        )
+        if not posts:
+            break
+
+        rows = []
+        for post in posts:
+            tag_names = [tag.name for tag in post.tags.all()]
+            rows.extend(
+                SearchTerm(term=term, post=post, weight=weight)
+                for term, weight in build_terms(post, tag_names).items()
+            )
+        SearchTerm.objects.bulk_create(rows, batch_size=batch_size)
+
+        indexed += len(posts)
+        last_pk = posts[-1].pk
+    return indexed
+
+
+def search_posts(query):
+    """
+    Return posts containing every term of the query, best match first.
+
+    The rank is the summed weight of the matched terms, ties are broken
+    by publication date.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return Post.objects.none()
+
+    return (
+        Post.objects.filter(search_terms__term__in=terms)
+        .annotate(rank=Sum('search_terms__weight'), matched=Count('search_terms'))
+        .filter(matched=len(terms))
+        .order_by('-rank', '-published_date', '-pk')
+    )
@@ -1,4 +1,72 @@
 // Basic example script to demonstrate dynamic behavior
 document.addEventListener("DOMContentLoaded", function () {
   console.log("Blog page loaded");
+
+  // "Load more" for post comments: fetch the next keyset page as JSON
+  // and append it to the comment list
+  const loadMore = document.querySelector(".load-more-comments");
+  if (!loadMore) {
+    return;
+  }
+
+  loadMore.addEventListener("click", function () {
+    const url =
+      loadMore.dataset.url +
+      "?after=" +
+      encodeURIComponent(loadMore.dataset.nextCursor);
+
+    fetch(url)
+      .then((response) => response.json())
+      .then((data) => {
+        const list = document.querySelector(".comments-list");
+        data.comments.forEach((comment) => {
+          list.appendChild(renderComment(comment));
+        });
+
+        if (data.next_cursor) {
+          loadMore.dataset.nextCursor = data.next_cursor;
+        } else {
+          loadMore.remove();
+        }
+      });
+  });
 });
+
+function renderComment(comment) {
+  const card = document.createElement("div");
+  card.className = "comment-card";
+
+  const header = document.createElement("div");
+  header.className = "comment-header";
+  const author = document.createElement("strong");
+  author.textContent = comment.author;
+  const date = document.createElement("span");
+  date.className = "comment-date";
+  date.textContent = comment.created_display;
+  header.append(author, " ", date);
+  if (comment.edited) {
+    const edited = document.createElement("span");
+    edited.className = "comment-edited";
+    edited.textContent = " (edited)";
+    header.append(edited);
+  }
+
+  const content = document.createElement("div");
+  content.className = "comment-content";
+  // Escaped and split into paragraphs by the server, like the
+  // linebreaks filter in the post_detail template
+  content.innerHTML = comment.content_html;
+  card.append(header, content);
+
+  if (comment.can_edit) {
+    const actions = document.createElement("div");
+    actions.className = "comment-actions";
+    actions.innerHTML =
+      '<a class="btn btn-sm btn-secondary">Edit</a> ' +
+      '<a class="btn btn-sm btn-danger">Delete</a>';
+    actions.children[0].href = comment.edit_url;
+    actions.children[1].href = comment.delete_url;
+    card.append(actions);
+  }
+  return card;
+}
@@ -0,0 +1,161 @@
+"""
+Bulk tag assignment for posts and the materialized tag counters.
+
+Works on taggit's ``Tag`` and ``TaggedItem`` tables directly so syncing a
+post's tags costs the same handful of queries whether it has one tag or
+fifty, instead of a ``get_or_create`` plus an ``add`` per tag.
+
+``TagStats`` rows are adjusted with ``F()`` updates whenever tags are
+synced or a post is deleted, so reading tag counts never needs a
+``GROUP BY`` over the taggit through-table.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed
+from taggit.models import Tag, TaggedItem
+
+from blog.models import Post, TagStats
+
+
+def normalize_tag_names(names):
+    """Strip, lowercase and deduplicate tag names"""
+    return sorted({name.strip().lower() for name in names if name.strip()})
+
+
+def resolve_tags(names):
+    """Return {name: Tag} for the given names, creating the missing ones in bulk"""
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=Tag().slugify(name)) for name in missing],
+            ignore_conflicts=True,
+        )
+        tags.update((tag.name, tag) for tag in Tag.objects.filter(name__in=missing))
+
+        # A slug clash (e.g. "c++" and "c") makes bulk_create skip the row;
+        # Tag.save() knows how to pick a free slug for those rare cases.
+        for name in missing:
+            if name not in tags:
+                tags[name] = Tag.objects.create(name=name)
+    return tags
+
+
+def sync_post_tags(post, names):
+    """
+    Make ``post``'s tags exactly ``names``.
+
+    Only the difference against the current tags is written: one INSERT for
+    the added tags and one DELETE for the removed ones. ``m2m_changed`` is
+    sent the same way taggit does so the post's receivers still run.
+    """
+    names = normalize_tag_names(names)
+    content_type = ContentType.objects.get_for_model(Post)
+    items = TaggedItem.objects.filter(content_type=content_type, object_id=post.pk)
+    current = dict(items.values_list('tag__name', 'tag_id'))
+
+    to_add = [name for name in names if name not in current]
+    to_remove = {tag_id for name, tag_id in current.items() if name not in names}
+
+    db = router.db_for_write(TaggedItem, instance=post)
+    with transaction.atomic(using=db):
+        if to_remove:
+            items.filter(tag_id__in=to_remove).delete()
+            remove_post_from_tag_stats(post, to_remove)
+            m2m_changed.send(
+                sender=Post.tags.through, action='post_remove', instance=post,
+                reverse=False, model=Tag, pk_set=to_remove, using=db,
+            )
+
+        if to_add:
+            added = resolve_tags(to_add)
+            TaggedItem.objects.bulk_create([
+                TaggedItem(content_type=content_type, object_id=post.pk, tag=tag)
+                for tag in added.values()
+            ])
+            add_post_to_tag_stats(post, [tag.pk for tag in added.values()])
+            m2m_changed.send(
+                sender=Post.tags.through, action='post_add', instance=post,
+                reverse=False, model=Tag, pk_set={tag.pk for tag in added.values()}, using=db,
+            )
+
+    return to_add, to_remove
+
+
+def add_post_to_tag_stats(post, tag_ids):
+    """Count ``post`` towards the given tags"""
+    if not tag_ids:
+        return
+    TagStats.objects.bulk_create(
+        [TagStats(tag_id=tag_id) for tag_id in tag_ids], ignore_conflicts=True
+    )
+    published = Value(post.published_date)
+    TagStats.objects.filter(tag_id__in=tag_ids).update(
+        post_count=F('post_count') + 1,
+        last_post_date=Greatest(Coalesce('last_post_date', published), published),
+    )
+
+
+def remove_post_from_tag_stats(post, tag_ids=None):
+    """Stop counting ``post`` towards the given tags (default: all of its tags)"""
+    if tag_ids is None:
+        content_type = ContentType.objects.get_for_model(Post)
+        tag_ids = list(
+            TaggedItem.objects.filter(content_type=content_type, object_id=post.pk)
+            .values_list('tag_id', flat=True)
+        )
+    if not tag_ids:
+        return
+    TagStats.objects.filter(tag_id__in=tag_ids, post_count__gt=0).update(
+        post_count=F('post_count') - 1
+    )
+    # Only tags whose latest post this was need their date recomputed
+    stale = list(
+        TagStats.objects.filter(tag_id__in=tag_ids, last_post_date=post.published_date)
+        .values_list('tag_id', flat=True)
+    )
+    if stale:
+        refresh_last_post_dates(stale, exclude_post=post)
+
+
+def refresh_last_post_dates(tag_ids, exclude_post=None):
+    """Recompute the most recent post date of the given tags"""
+    posts = Post.objects.filter(tags__id__in=tag_ids)
+    if exclude_post is not None:
+        posts = posts.exclude(pk=exclude_post.pk)
+    latest = dict(posts.values_list('tags__id').annotate(latest=Max('published_date')))
+    TagStats.objects.bulk_update(
+        [TagStats(tag_id=tag_id, last_post_date=latest.get(tag_id)) for tag_id in tag_ids],
+        ['last_post_date'],
+    )
+
+
+def rebuild_tag_stats(batch_size=500):
+    """Recompute every TagStats row from scratch, one batch of tags at a time"""
+    rebuilt = 0
+    last_pk = 0
+    while True:
+        tag_ids = list(
+            Tag.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not tag_ids:
+            break
+
+        counts = (
+            Post.objects.filter(tags__id__in=tag_ids)
+            .values_list('tags__id')
+            .annotate(post_count=Count('pk'), last_post_date=Max('published_date'))
+        )
+        with transaction.atomic():
+            TagStats.objects.filter(tag_id__in=tag_ids).delete()
+            TagStats.objects.bulk_create([
+                TagStats(tag_id=tag_id, post_count=post_count, last_post_date=last_post_date)
+                for tag_id, post_count, last_post_date in counts
+            ])
+
+        rebuilt += len(tag_ids)
+        last_pk = tag_ids[-1]
+    return rebuilt
@@ -1,3 +1,378 @@
-from django.test import TestCase
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Post, Comment, SearchTerm, TagStats
+from blog.forms import PostForm
+from blog.response_cache import cache_response, get_metrics, purge
+from blog.search import rebuild_index, search_posts
+from blog.tags import rebuild_tag_stats, sync_post_tags
+
+
+class PostSearchTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="authorPass")
+        self.title_match = Post.objects.create(
+            title="Django performance", content="Notes on caching.", author=self.author
+        )
+        self.content_match = Post.objects.create(
+            title="Weekly notes", content="A little about django and caching.", author=self.author
+        )
+        self.other = Post.objects.create(
+            title="Gardening", content="Tomatoes and peppers.", author=self.author
+        )
+
+    def test_index_updated_on_save(self):
+        self.other.title = "Gardening with django"
+        self.other.save()
+        self.assertIn(self.other, search_posts("django"))
+
+    def test_index_updated_on_tag_change(self):
+        self.other.tags.add("python")
+        self.assertEqual(list(search_posts("python")), [self.other])
+        self.other.tags.clear()
+        self.assertEqual(list(search_posts("python")), [])
+
+    def test_index_cleared_on_delete(self):
+        post_id = self.title_match.pk
+        self.title_match.delete()
+        self.assertFalse(SearchTerm.objects.filter(post_id=post_id).exists())
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(list(search_posts("django")), [self.title_match, self.content_match])
+
+    def test_all_terms_required(self):
+        self.assertEqual(list(search_posts("django tomatoes")), [])
+        self.assertEqual(list(search_posts("tomatoes peppers")), [self.other])
+
+    def test_rebuild_index(self):
+        SearchTerm.objects.all().delete()
+        self.assertEqual(rebuild_index(batch_size=2), 3)
+        self.assertEqual(list(search_posts("gardening")), [self.other])
+
+    def test_search_view_paginates(self):
+        for i in range(12):
+            Post.objects.create(title=f"Django post {i}", content="", author=self.author)
+        response = self.client.get(reverse('blog:search'), {'q': 'django'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['paginator'].count, 14)
+        self.assertEqual(len(response.context['posts']), 10)
+
+
+class PostListViewTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="authorPass")
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(title=f"Post {i}", content="Body", author=self.author)
+            post.tags.add("django", f"tag-{i}")
+
+    def test_query_count_is_constant(self):
+        # One query for the posts (with their authors) and one for all their tags
+        for count in (3, 25):
+            Post.objects.all().delete()
+            self.create_posts(count)
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('blog:posts'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_keyset_pages_cover_all_posts(self):
+        self.create_posts(25)
+        seen = []
+        url = reverse('blog:posts')
+        params = {}
+        while True:
+            response = self.client.get(url, params)
+            page = response.context['page_obj']
+            seen.extend(post.pk for post in page)
+            if not page.has_next():
+                break
+            params = {'after': page.next_cursor}
+        expected = list(Post.objects.order_by('-published_date', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('blog:posts'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostDetailCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="authorPass")
+        self.reader = User.objects.create_user(username="reader", password="readerPass")
+        self.post = Post.objects.create(title="Cached post", content="Body", author=self.author)
+        Comment.objects.create(post=self.post, author=self.reader, content="First!")
+        self.url = reverse('blog:post_detail', kwargs={'pk': self.post.pk})
+
+    def test_anonymous_page_served_from_cache(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "First!")
+
+    def test_comment_invalidates_cached_page(self):
+        self.client.get(self.url)
+        Comment.objects.create(post=self.post, author=self.reader, content="Second!")
+        self.assertContains(self.client.get(self.url), "Second!")
+
+    def test_post_update_invalidates_cached_page(self):
+        self.client.get(self.url)
+        self.post.title = "Renamed post"
+        self.post.save()
+        self.assertContains(self.client.get(self.url), "Renamed post")
+
+    def test_logged_in_user_gets_cached_fragments(self):
+        self.client.force_login(self.reader)
+        self.client.get(self.url)
+        # Session, user and post lookups only: the comments are not queried again
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertContains(response, "First!")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertContains(response, reverse('blog:edit_comment', kwargs={'pk': self.post.comments.get().pk}))
+
+    def test_comment_actions_not_shared_between_users(self):
+        self.client.force_login(self.reader)
+        self.client.get(self.url)
+        self.client.force_login(self.author)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, reverse('blog:edit_comment', kwargs={'pk': self.post.comments.get().pk}))
+
+
+class CommentPaginationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="authorPass")
+        self.post = Post.objects.create(title="Busy post", content="Body", author=self.author)
+        for i in range(45):
+            Comment.objects.create(post=self.post, author=self.author, content=f"Comment {i}")
+
+    def test_detail_shows_first_page(self):
+        response = self.client.get(reverse('blog:post_detail', kwargs={'pk': self.post.pk}))
+        self.assertContains(response, "Comments (45)")
+        self.assertContains(response, "Comment 44")
+        self.assertNotContains(response, "Comment 24<")
+        self.assertContains(response, "load-more-comments")
+
+    def test_load_more_walks_all_comments(self):
+        url = reverse('blog:post_comments', kwargs={'pk': self.post.pk})
+        seen = []
+        params = {}
+        while True:
+            with self.assertNumQueries(1):
+                data = self.client.get(url, params).json()
+            seen.extend(comment['content'] for comment in data['comments'])
+            if not data['next_cursor']:
+                break
+            params = {'after': data['next_cursor']}
+        self.assertEqual(seen, [f"Comment {i}" for i in reversed(range(45))])
+
+    def test_load_more_matches_rendered_comments(self):
+        Comment.objects.create(post=self.post, author=self.author, content="<b>First</b>\n\nSecond")
+        data = self.client.get(reverse('blog:post_comments', kwargs={'pk': self.post.pk})).json()
+        self.assertEqual(data['comments'][0]['content_html'], "<p>&lt;b&gt;First&lt;/b&gt;</p>\n\n<p>Second</p>")
+
+    def test_load_more_missing_post(self):
+        response = self.client.get(reverse('blog:post_comments', kwargs={'pk': self.post.pk + 1}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_str_needs_no_post_query(self):
+        response = self.client.get(reverse('blog:post_detail', kwargs={'pk': self.post.pk}))
+        comments = list(response.context['comments'])
+        with self.assertNumQueries(0):
+            self.assertEqual(str(comments[0]), "Comment by author on Busy post")
+
+
+class PostFormTagSyncTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="authorPass")
+
+    def save_post(self, tags, instance=None):
+        form = PostForm(
+            data={'title': "Tagged post", 'content': "Body", 'tags': ', '.join(tags)},
+            instance=instance or Post(author=self.author),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            post = form.save()
+        return post, len(queries)
+
+    def test_tags_saved_normalized(self):
+        post, _ = self.save_post(["Django", "python", "django"])
+        self.assertEqual(sorted(post.tags.names()), ["django", "python"])
+
+    def test_tags_diffed_on_update(self):
+        post, _ = self.save_post(["django", "python"])
+        post, _ = self.save_post(["python", "web"], instance=post)
+        self.assertEqual(sorted(post.tags.names()), ["python", "web"])
+        self.assertEqual(list(search_posts("web")), [post])
+        self.assertEqual(list(search_posts("django")), [])
+
+    def test_query_count_independent_of_tag_count(self):
+        self.save_post(["warmup"])  # populate the ContentType cache
+        _, one_tag = self.save_post(["tag0"])
+        _, many_tags = self.save_post([f"many{i}" for i in range(50)])
+        self.assertEqual(one_tag, many_tags)
+
+    def test_slug_clash_still_creates_tag(self):
+        post, _ = self.save_post(["c", "c!"])
+        self.assertEqual(sorted(post.tags.names()), ["c", "c!"])
+
+
+class TagStatsTestCase(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="authorPass")
+
+    def save_post(self, tags, instance=None):
+        form = PostForm(
+            data={'title': "Tagged post", 'content': "Body", 'tags': ', '.join(tags)},
+            instance=instance or Post(author=self.author),
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def counts(self):
+        return dict(TagStats.objects.filter(post_count__gt=0).values_list('tag__name', 'post_count'))
+
+    def test_counters_follow_form_saves_and_deletes(self):
+        first = self.save_post(["django", "python"])
+        second = self.save_post(["django"])
+        self.assertEqual(self.counts(), {"django": 2, "python": 1})
+
+        self.save_post(["python", "web"], instance=second)
+        self.assertEqual(self.counts(), {"django": 1, "python": 2, "web": 1})
+
+        first.delete()
+        self.assertEqual(self.counts(), {"python": 1, "web": 1})
+        self.assertIsNone(TagStats.objects.get(tag__name="django").last_post_date)
+        self.assertEqual(TagStats.objects.get(tag__name="web").last_post_date, second.published_date)
+
+    def test_removing_older_post_keeps_last_post_date(self):
+        first = self.save_post(["django"])
+        second = self.save_post(["django"])
+        with CaptureQueriesContext(connection) as queries:
+            first.delete()
+        self.assertFalse([q for q in queries.captured_queries if 'MAX(' in q['sql']])
+        self.assertEqual(TagStats.objects.get(tag__name="django").last_post_date, second.published_date)
+
+        with CaptureQueriesContext(connection) as queries:
+            second.delete()
+        self.assertTrue([q for q in queries.captured_queries if 'MAX(' in q['sql']])
+        self.assertIsNone(TagStats.objects.get(tag__name="django").last_post_date)
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.save_post(["django", "python"])
+        self.save_post(["django"])
+        expected = self.counts()
+        TagStats.objects.all().delete()
+        rebuild_tag_stats(batch_size=1)
+        self.assertEqual(self.counts(), expected)
+
+    def test_tag_cloud_and_json(self):
+        self.save_post(["django", "python"])
+        self.save_post(["django"])
+        response = self.client.get(reverse('blog:tag_cloud'))
+        self.assertContains(response, "tag-size-5")
+        data = self.client.get(reverse('blog:tag_stats')).json()
+        self.assertEqual([(tag['name'], tag['post_count']) for tag in data['tags']], [("django", 2), ("python", 1)])
+
+    def test_posts_by_tag_page(self):
+        self.save_post(["django"])
+        response = self.client.get(reverse('blog:posts_by_tag', kwargs={'tag_slug': 'django'}))
+        self.assertContains(response, "Found 1 post(s) with this tag")
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.author = User.objects.create_user(username="author", password="authorPass")
+        self.post = Post.objects.create(title="Cached listing", content="Body", author=self.author)
+        self.url = reverse('blog:posts')
+
+    def test_list_served_from_cache(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertContains(response, "Cached listing")
+
+    def test_post_save_purges_list(self):
+        self.client.get(self.url)
+        self.post.title = "Renamed listing"
+        self.post.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "Renamed listing")
+
+    def test_entries_vary_on_permissions(self):
+        self.client.get(self.url)
+        self.client.force_login(self.author)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        # Same permissions, same entry
+        reader = User.objects.create_user(username="reader", password="readerPass")
+        self.client.force_login(reader)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+    def test_stale_while_revalidate(self):
+        renders = []
+
+        @cache_response(timeout=0, stale_while_revalidate=60, name='test-swr')
+        def view(request):
+            renders.append(request)
+            if len(renders) == 2:
+                # A request arriving while this one renders the fresh copy
+                concurrent = view(self.factory.get('/swr/'))
+                self.assertEqual((concurrent['X-Cache'], concurrent.content), ('STALE', b'render 1'))
+            return HttpResponse(f'render {len(renders)}')
+
+        self.assertEqual(view(self.factory.get('/swr/')).content, b'render 1')
+        self.assertEqual(view(self.factory.get('/swr/')).content, b'render 2')
+        self.assertEqual(get_metrics()['test-swr'], {'hit': 0, 'stale': 1, 'miss': 2, 'bypass': 0, 'hit_ratio': 0.3333})
+
+        # Purged entries are never served stale
+        purge('swr')
+        renders.clear()
+
+        @cache_response(timeout=0, stale_while_revalidate=60, tags=['swr'], name='test-swr-purge')
+        def purged_view(request):
+            renders.append(request)
+            return HttpResponse(f'render {len(renders)}')
+
+        purged_view(self.factory.get('/swr/'))
+        purge('swr')
+        self.assertEqual(purged_view(self.factory.get('/swr/'))['X-Cache'], 'MISS')
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location, self.settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }}, POST_VERSION_CACHE_ALIAS='default'):
+            url = reverse('blog:tag_stats')
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+            sync_post_tags(self.post, ["django"])
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.json()['tags'][0]['name'], "django")
+
+    def test_metrics_endpoint(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        url = reverse('blog:response_cache_metrics')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.author.is_staff = True
+        self.author.save()
+        self.client.force_login(self.author)
+        metrics = self.client.get(url).json()['views']['blog:posts']
+        self.assertEqual((metrics['hit'], metrics['miss'], metrics['hit_ratio']), (1, 1, 0.5))
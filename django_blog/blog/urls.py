@@ -4,8 +4,8 @@ from django.contrib.auth.views import LoginView, LogoutView
 from . import views
 from .views import (
     PostListView, PostDetailView, PostCreateView, PostUpdateView, PostDeleteView,
-    CommentCreateView, CommentDeleteView, CommentUpdateView,
-    PostSearchView, PostByTagListView
+    CommentCreateView, CommentDeleteView, CommentUpdateView, CommentListJSONView,
+    PostSearchView, PostByTagListView, TagCloudView, TagStatsJSONView
 )
 
 app_name = 'blog'
@@ -24,11 +24,16 @@ urlpatterns = [
     path('post/new/', PostCreateView.as_view(), name='create_post'),
     path('post/<int:pk>/delete/', PostDeleteView.as_view(), name='delete_post'),
     # Comments
+    path('post/<int:pk>/comments/', CommentListJSONView.as_view(), name='post_comments'),
     path('post/<int:pk>/comments/new/', CommentCreateView.as_view(), name='add_comment'),
     path('comment/<int:pk>/update/', CommentUpdateView.as_view(), name='edit_comment'),
     path('comment/<int:pk>/delete/', CommentDeleteView.as_view(), name='delete_comment'),
     # Search
     path('search/', PostSearchView.as_view(), name='search'),
     # Tags
+    path('tags/', TagCloudView.as_view(), name='tag_cloud'),
+    path('tags/cloud.json', TagStatsJSONView.as_view(), name='tag_stats'),
     path('tags/<slug:tag_slug>/', PostByTagListView.as_view(), name='posts_by_tag'),
+    # Response cache
+    path('cache/metrics/', views.response_cache_metrics, name='response_cache_metrics'),
 ]
\ No newline at end of file
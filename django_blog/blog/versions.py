@@ -0,0 +1,30 @@
+"""
+Version counters kept in a cache.
+
+Keys that embed a version become unreachable as soon as it is bumped, which
+invalidates a whole group of entries without knowing which ones exist. A
+missing version starts at the current time in nanoseconds, so a counter
+evicted from the cache never comes back with a number older entries were
+stored under.
+"""
+import time
+
+
+def get_versions(cache, keys):
+    """Map each of ``keys`` to its current version, starting missing ones"""
+    versions = cache.get_many(keys)
+    for key in set(keys) - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return versions
+
+
+def get_version(cache, key):
+    return get_versions(cache, [key])[key]
+
+
+def bump_version(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
@@ -5,15 +5,26 @@ from django.conf import settings
 from rest_framework import status
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views import generic
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 from django.db.models import Q
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.defaultfilters import date as format_date, linebreaks_filter
+from django.utils.timezone import localtime
 from taggit.models import Tag
 
-from blog.models import Post, Comment
+from blog.models import Post, Comment, TagStats
+from blog.search import search_posts
+from blog.pagination import paginate_keyset
+from blog.cache import POST_CACHE_TIMEOUT, get_post_version, post_page_key
+from blog.response_cache import cache_response, get_metrics
 from api.serializers import PostSerializer
 from .forms import (
     RegistrationForm, 
@@ -22,6 +33,8 @@ from .forms import (
     CommentForm
 )
 
+COMMENTS_PER_PAGE = 20
+
 @csrf_exempt
 def register(request):
     print(f"requst method = {request.method}")
@@ -67,26 +80,65 @@ def profile(request):
     return render(request, 'blog/profile.html', {"form": form})
 
 # Post views
+@method_decorator(cache_response(tags=['posts'], stale_while_revalidate=60), name='get')
 class PostListView(generic.ListView):
-    """Display all blog posts"""
+    """Display all blog posts, newest first, one keyset page at a time"""
     model = Post
     template_name = 'blog/posts_list.html'
     context_object_name = 'posts'
-    ordering = ['-published_date']
+    paginate_by = 10
+
+    def get_queryset(self):
+        return Post.objects.select_related('author').prefetch_related('tags')
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginate_keyset(
+            queryset, 'published_date', page_size, self.request.GET.get('after')
+        )
+        return (None, page, page.object_list, page.has_next())
 
 
 class PostDetailView(generic.DetailView):
-    """Display individual blog post"""
+    """
+    Display individual blog post
+
+    Anonymous readers are served the whole page from the cache. Logged-in
+    users share the cached post body and comment list fragments (see the
+    template) and only get the user-specific parts rendered per request.
+    """
     model = Post
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
 
+    def get_queryset(self):
+        return Post.objects.select_related('author')
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        page_key = post_page_key(self.kwargs['pk'], get_post_version(self.kwargs['pk']))
+        content = cache.get(page_key)
+        if content is None:
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            cache.set(page_key, response.content, POST_CACHE_TIMEOUT)
+            return response
+        return HttpResponse(content)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get all comments for this post, ordered by creation date
-        context['comments'] = self.object.comments.all()
+        # Lazy page: only fetched when the comments fragment is not cached,
+        # later pages are loaded through CommentListJSONView. Comments from
+        # the related manager already carry the post, for Comment.__str__
+        comments = self.object.comments.select_related('author')
+        context['comments'] = SimpleLazyObject(
+            lambda: paginate_keyset(comments, 'created_at', COMMENTS_PER_PAGE)
+        )
         # Provide the comment form for authenticated users
         context['comment_form'] = CommentForm()
+        context['post_version'] = get_post_version(self.object.pk)
+        context['cache_timeout'] = POST_CACHE_TIMEOUT
         return context
 
 
@@ -152,6 +204,36 @@ class CommentCreateView(LoginRequiredMixin, generic.CreateView):
         return context
 
 
+class CommentListJSONView(generic.View):
+    """Return the next page of a post's comments as JSON for "load more" """
+
+    def get(self, request, pk):
+        comments = Comment.objects.filter(post_id=pk).select_related('author', 'post')
+        page = paginate_keyset(comments, 'created_at', COMMENTS_PER_PAGE, request.GET.get('after'))
+        # An empty page is the only case needing to know whether the post exists
+        if not page.object_list and not Post.objects.filter(pk=pk).exists():
+            raise Http404('No post found')
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'content': comment.content,
+                    # Rendered as in post_detail.html, for the script to insert as is
+                    'content_html': linebreaks_filter(comment.content, autoescape=True),
+                    'created_at': comment.created_at.isoformat(),
+                    'created_display': format_date(localtime(comment.created_at), 'F d, Y H:i'),
+                    'edited': comment.updated_at != comment.created_at,
+                    'can_edit': request.user.pk == comment.author_id, # type: ignore
+                    'edit_url': reverse('blog:edit_comment', kwargs={'pk': comment.pk}),
+                    'delete_url': reverse('blog:delete_comment', kwargs={'pk': comment.pk}),
+                }
+                for comment in page
+            ],
+            'next_cursor': page.next_cursor,
+        })
+
+
 class CommentUpdateView(LoginRequiredMixin, UserPassesTestMixin, generic.UpdateView):
     """Allow comment authors to edit their comments"""
     model = Comment
@@ -191,19 +273,16 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteV
 
 # Search View
 class PostSearchView(generic.ListView):
-    """Search posts by title, content, or tags"""
+    """Search posts by title, content, or tags using the inverted search index"""
     model = Post
     template_name = 'blog/search_results.html'
     context_object_name = 'posts'
+    paginate_by = 10
 
     def get_queryset(self):
         query = self.request.GET.get('q', '')
         if query:
-            return Post.objects.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__name__icontains=query)
-            ).distinct().order_by('-published_date')
+            return search_posts(query).select_related('author').prefetch_related('tags')
         return Post.objects.none()
 
     def get_context_data(self, **kwargs):
@@ -213,17 +292,79 @@ class PostSearchView(generic.ListView):
 
 
 # Tag Views
+@method_decorator(cache_response(tags=['posts', 'tags']), name='get')
 class PostByTagListView(generic.ListView):
     """Display all posts with a specific tag"""
     model = Post
-    template_name = 'blog/posts_by_tag.html'
+    template_name = 'blog/post_tags.html'
     context_object_name = 'posts'
 
     def get_queryset(self):
         self.tag = get_object_or_404(Tag, slug=self.kwargs['tag_slug'])
-        return Post.objects.filter(tags__in=[self.tag]).order_by('-published_date')
+        return (
+            Post.objects.filter(tags__in=[self.tag])
+            .select_related('author')
+            .prefetch_related('tags')
+            .order_by('-published_date')
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['tag'] = self.tag
-        return context
\ No newline at end of file
+        context['tag_stats'] = TagStats.objects.filter(tag=self.tag).first()
+        return context
+
+
+@method_decorator(cache_response(tags=['tags'], stale_while_revalidate=60), name='get')
+class TagCloudView(generic.ListView):
+    """Display the most used tags, sized by how many posts carry them"""
+    template_name = 'blog/tag_cloud.html'
+    context_object_name = 'tags'
+    max_tags = 100
+
+    def get_queryset(self):
+        return (
+            TagStats.objects.filter(post_count__gt=0)
+            .select_related('tag')
+            .order_by('-post_count')[:self.max_tags]
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tags = list(context['tags'])
+        most_used = max((stats.post_count for stats in tags), default=1)
+        for stats in tags:
+            # Font size bucket from 1 (rare) to 5 (most used)
+            stats.size = 1 + round(4 * stats.post_count / most_used)
+        context['tags'] = sorted(tags, key=lambda stats: stats.tag.name)
+        return context
+
+
+@method_decorator(cache_response(tags=['tags']), name='get')
+class TagStatsJSONView(generic.View):
+    """Return tag post counts and most recent post dates as JSON"""
+    max_tags = 100
+
+    def get(self, request):
+        stats = (
+            TagStats.objects.filter(post_count__gt=0)
+            .select_related('tag')
+            .order_by('-post_count')[:self.max_tags]
+        )
+        return JsonResponse({
+            'tags': [
+                {
+                    'name': tag_stats.tag.name,
+                    'slug': tag_stats.tag.slug,
+                    'post_count': tag_stats.post_count,
+                    'last_post_date': tag_stats.last_post_date.isoformat() if tag_stats.last_post_date else None,
+                }
+                for tag_stats in stats
+            ]
+        })
+
+
+@staff_member_required
+def response_cache_metrics(request):
+    """Hit/miss counts of the response cache, per view"""
+    return JsonResponse({'views': get_metrics()})
@@ -46,7 +46,7 @@ INSTALLED_APPS = [
     'taggit',
 
     'blog.apps.BlogConfig',
-    # 'api.apps.ApiConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -92,6 +92,45 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django-blog',
+    },
+    # Post versions (blog.cache) decide which cached pages are current and
+    # back the API's ETags, so every worker must see the same values or the
+    # others keep serving stale pages and 304s. A file cache is shared by
+    # the processes of one host; use Redis or Memcached across hosts.
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Cache holding the post versions, see above
+POST_VERSION_CACHE_ALIAS = 'versions'
+
+# How long rendered post detail pages and fragments are kept (seconds)
+POST_CACHE_TIMEOUT = 60 * 15
+
+# Whole-response cache of the list views (blog.response_cache). Point the
+# alias at a FileBasedCache to share entries between worker processes.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+REST_FRAMEWORK = {
+    # orjson-backed JSON; falls back to the stock encoder if orjson is missing
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
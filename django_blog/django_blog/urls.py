@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 
 urlpatterns = [
-    # path("api/", include('api.urls')),
+    path("api/", include('api.urls')),
     path('blog/', include('blog.urls', namespace='blog')),
     path('admin/', admin.site.urls),
 ]
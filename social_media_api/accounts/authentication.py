@@ -0,0 +1,161 @@
+"""
+Token authentication with a token -> user lookup cache.
+
+DRF's ``TokenAuthentication`` joins ``authtoken_token`` and the user table
+on every request. ``CachingTokenAuthentication`` keeps the result in a
+bounded LRU with a TTL in process memory and, optionally, in a shared
+Django cache so other workers can reuse it.
+
+Entries are evicted when a token is deleted (which is also how tokens are
+rotated, since the key is the primary key) and whenever its user is saved,
+which covers deactivation, or follows/unfollows someone (the follow
+counters are updated in place). Signals only reach the process they fire in, so
+other workers' in-memory copies live until their TTL runs out; keep
+``TTL`` short when running several processes.
+
+Configured through the ``TOKEN_AUTH_CACHE`` setting::
+
+    TOKEN_AUTH_CACHE = {
+        'MAX_SIZE': 10000,      # entries kept in process memory
+        'TTL': 60,              # seconds
+        'SHARED_CACHE': None,   # alias from CACHES, e.g. 'default'
+    }
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .signals import user_followed, user_unfollowed
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_CACHE': None,
+}
+
+
+class TokenCache:
+    """Bounded LRU/TTL map of token key -> user, with an optional shared tier"""
+
+    def __init__(self, max_size, ttl, shared_cache=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()  # key -> (user, expires_at)
+        self._keys_by_user = {}        # user pk -> set of keys
+        self._lock = threading.Lock()
+
+    def _shared_key(self, key):
+        return 'tokenauth:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return user
+                self._discard(key)
+
+        if self.shared_cache is not None:
+            user = self.shared_cache.get(self._shared_key(key))
+            if user is not None:
+                self._store_local(key, user)
+                return user
+        return None
+
+    def set(self, key, user):
+        user = copy.copy(user)
+        self._store_local(key, user)
+        if self.shared_cache is not None:
+            self.shared_cache.set(self._shared_key(key), user, self.ttl)
+
+    def evict(self, key):
+        with self._lock:
+            self._discard(key)
+        if self.shared_cache is not None:
+            self.shared_cache.delete(self._shared_key(key))
+
+    def evict_user(self, user_pk):
+        with self._lock:
+            keys = set(self._keys_by_user.get(user_pk, ()))
+            for key in keys:
+                self._discard(key)
+        if self.shared_cache is not None:
+            keys.update(Token.objects.filter(user_id=user_pk).values_list('key', flat=True))
+            self.shared_cache.delete_many([self._shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _store_local(self, key, user):
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[0].pk)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry[0].pk]
+
+
+def _build_token_cache():
+    options = {**DEFAULTS, **getattr(settings, 'TOKEN_AUTH_CACHE', {})}
+    shared = caches[options['SHARED_CACHE']] if options['SHARED_CACHE'] else None
+    return TokenCache(options['MAX_SIZE'], options['TTL'], shared)
+
+
+token_cache = _build_token_cache()
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that serves repeat lookups from ``token_cache``"""
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is not None:
+            # Each request gets its own copy so per-request state set on the
+            # user (e.g. permission caches) never leaks between requests
+            user = copy.copy(user)
+            return (user, self.get_model()(key=key, user=user))
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return (user, token)
+
+
+# Signal handlers evicting stale cache entries
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def evict_saved_user(sender, instance, created, **kwargs):
+    if not created:
+        token_cache.evict_user(instance.pk)
+
+@receiver(user_followed)
+@receiver(user_unfollowed)
+def evict_follow_users(sender, follower, followed, **kwargs):
+    token_cache.evict_user(follower.pk)
+    token_cache.evict_user(followed.pk)
@@ -0,0 +1,40 @@
+"""
+Authentication backend checking passwords on the hasher pool.
+
+Used through ``django.contrib.auth.authenticate()`` like ModelBackend, so
+the other AUTHENTICATION_BACKENDS and the ``user_login_failed`` signal
+still apply.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from .passwords import run_in_pool, verify_password
+
+UserModel = get_user_model()
+
+
+class PooledPasswordBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            # The auth token is loaded along with the user for the login view
+            user = UserModel._default_manager.select_related('auth_token').get(
+                **{UserModel.USERNAME_FIELD: username}
+            )
+        except UserModel.DoesNotExist:
+            # Hash anyway so a missing user takes as long as a wrong password
+            run_in_pool(make_password, password)
+            return None
+
+        valid, new_encoded = run_in_pool(verify_password, password, user.password)
+        if not valid or not self.user_can_authenticate(user):
+            return None
+
+        if new_encoded:
+            user.password = new_encoded
+            user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,68 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+from accounts.passwords import POOL_SIZE
+
+UserModel = get_user_model()
+USERNAME = 'benchmark_login_user'
+PASSWORD = 'benchmarkPass123'
+
+
+def legacy_login():
+    """The previous UserLoginView path"""
+    user = ModelBackend().authenticate(None, username=USERNAME, password=PASSWORD)
+    token, created = Token.objects.get_or_create(user=user)
+    return token.key
+
+
+def pooled_login():
+    user = authenticate(username=USERNAME, password=PASSWORD)
+    try:
+        return user.auth_token.key
+    except Token.DoesNotExist:
+        return Token.objects.create(user=user).key
+
+
+class Command(BaseCommand):
+    help = 'Measure logins/sec (and per core) of the old and the pooled login path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Logins per scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Simulated request threads')
+
+    def handle(self, *args, **options):
+        # Request threads use their own database connections, so the
+        # benchmark user is committed and removed again afterwards.
+        user = UserModel.objects.create_user(username=USERNAME, email='bench@test.com', password=PASSWORD)
+        Token.objects.create(user=user)
+        cores = os.cpu_count() or 1
+        self.stdout.write(
+            f'{options["concurrency"]} request threads, {POOL_SIZE} hasher threads, {cores} cores'
+        )
+        try:
+            for label, func in [('legacy', legacy_login), ('pooled', pooled_login)]:
+                rate = self.measure(func, options['logins'], options['concurrency'])
+                self.stdout.write(f'{label:7} {rate:8.1f} logins/s   {rate / cores:8.1f} logins/s/core')
+        finally:
+            user.delete()
+
+    def measure(self, func, count, concurrency):
+        def request_thread(n):
+            try:
+                for _ in range(n):
+                    func()
+            finally:
+                connection.close()
+
+        per_thread = [count // concurrency + (i < count % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as requests:
+            list(requests.map(request_thread, per_thread))
+        return count / (time.perf_counter() - start)
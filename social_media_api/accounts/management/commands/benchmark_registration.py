@@ -0,0 +1,61 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from accounts.views import UserRegistrationView
+
+UserModel = get_user_model()
+
+
+def legacy_register(i):
+    """The previous registration path: inline hashing and a token re-query"""
+    # The serializer's username uniqueness check
+    UserModel.objects.filter(username=f'legacy_{i}').exists()
+    user = UserModel.objects.create_user(
+        username=f'legacy_{i}', email=f'legacy_{i}@test.com', password='benchmarkPass123'
+    )
+    Token.objects.create(user=user)
+    return Token.objects.get(user=user).key
+
+
+class Command(BaseCommand):
+    help = 'Measure registrations/sec and queries per registration, old path vs pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--registrations', type=int, default=50, help='Registrations per scenario')
+
+    def handle(self, *args, **options):
+        count = options['registrations']
+        factory = APIRequestFactory()
+        view = UserRegistrationView.as_view()
+
+        def pipeline_register(i):
+            request = factory.post('/accounts/register/', {
+                'username': f'pipeline_{i}',
+                'email': f'pipeline_{i}@test.com',
+                'password': 'benchmarkPass123',
+                'password_confirm': 'benchmarkPass123',
+            }, format='json')
+            response = view(request)
+            assert response.status_code == 201, response.data
+
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the benchmark users never reach the real database. Inside it the
+        # pipeline's own atomic block shows up as a SAVEPOINT/RELEASE pair.
+        with transaction.atomic():
+            for label, func in [('legacy', legacy_register), ('pipeline', pipeline_register)]:
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for i in range(count):
+                        func(i)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{label:9} {count / elapsed:7.1f} registrations/s'
+                    f'   {len(queries) / count:4.1f} queries/registration'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from accounts.authentication import CachingTokenAuthentication, token_cache
+
+UserModel = get_user_model()
+
+
+class WhoAmIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'id': request.user.pk})
+
+
+class Command(BaseCommand):
+    help = 'Measure authenticated requests/sec with and without the token lookup cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per scenario')
+
+    def handle(self, *args, **options):
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the benchmark user never reaches the real database.
+        with transaction.atomic():
+            user = UserModel.objects.create_user(username='benchmark_token_user', password='!')
+            token = Token.objects.create(user=user)
+            factory = APIRequestFactory()
+
+            results = {}
+            for label, auth_class in [('uncached', TokenAuthentication), ('cached', CachingTokenAuthentication)]:
+                token_cache.clear()
+                view = WhoAmIView.as_view(authentication_classes=[auth_class])
+                count = options['requests']
+                start = time.perf_counter()
+                for _ in range(count):
+                    request = factory.get('/whoami/', HTTP_AUTHORIZATION=f'Token {token.key}')
+                    response = view(request)
+                    assert response.status_code == 200
+                results[label] = count / (time.perf_counter() - start)
+                self.stdout.write(f'{label:9} {results[label]:9.1f} req/s')
+
+            self.stdout.write(f'speedup   {results["cached"] / results["uncached"]:9.1f}x')
+            transaction.set_rollback(True)
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+UserModel = get_user_model()
+
+
+def follow_count_subquery(column):
+    """Number of follow rows where ``column`` is the outer user"""
+    Follow = UserModel.followers.through
+    counts = (
+        Follow.objects.filter(**{column: OuterRef('pk')})
+        .values(column)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized followers/following counters from the follow table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users to recount per UPDATE statement',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        followers = follow_count_subquery('from_customuser')
+        following = follow_count_subquery('to_customuser')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                UserModel.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            updated += UserModel.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(
+                followers_count=followers, following_count=following
+            )
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Recounted follows for {updated} users'))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:12
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Follow = CustomUser.followers.through
+
+    def count_for(column):
+        counts = (
+            Follow.objects.filter(**{column: OuterRef('pk')})
+            .values(column)
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    CustomUser.objects.update(
+        followers_count=count_for('from_customuser'),
+        following_count=count_for('to_customuser'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of users following this user'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of users this user follows'),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
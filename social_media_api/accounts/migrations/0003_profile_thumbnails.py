@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_follow_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_thumbnails',
+            field=models.JSONField(blank=True, default=dict, help_text='Generated profile picture thumbnails'),
+        ),
+    ]
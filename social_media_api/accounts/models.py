@@ -1,18 +1,54 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
 
+from .signals import user_followed, user_unfollowed
+
 class CustomUser(AbstractUser):
     """Extended user model for social media platforms"""
 
     bio = models.TextField(max_length=500, blank=True, help_text="Short biography about the user")
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True, help_text="User's profile image")
+    # {size: {format: name}} written by the background image pipeline
+    profile_thumbnails = models.JSONField(default=dict, blank=True, help_text="Generated profile picture thumbnails")
     followers = models.ManyToManyField('self', symmetrical=False, related_name='following', blank=True, help_text="Users who follow this user")
+    # Denormalized follow counters, kept in sync by follow()/unfollow()
+    followers_count = models.PositiveIntegerField(default=0, help_text="Number of users following this user")
+    following_count = models.PositiveIntegerField(default=0, help_text="Number of users this user follows")
 
     def __str__(self):
         return self.username
     
     def get_followers_count(self):
-        return self.followers.count()
+        return self.followers_count
     
-    # def get_following_count(self):
-    #     return self.following.count()
\ No newline at end of file
+    def get_following_count(self):
+        return self.following_count
+
+    def follow(self, user):
+        """Follow ``user``. Returns False if already following."""
+        Follow = CustomUser.followers.through
+        with transaction.atomic():
+            _, created = Follow.objects.get_or_create(
+                from_customuser=user, to_customuser=self
+            )
+            if created:
+                CustomUser.objects.filter(pk=user.pk).update(followers_count=F('followers_count') + 1)
+                CustomUser.objects.filter(pk=self.pk).update(following_count=F('following_count') + 1)
+        if created:
+            user_followed.send(sender=CustomUser, follower=self, followed=user)
+        return created
+
+    def unfollow(self, user):
+        """Stop following ``user``. Returns False if not following."""
+        Follow = CustomUser.followers.through
+        with transaction.atomic():
+            deleted, _ = Follow.objects.filter(
+                from_customuser=user, to_customuser=self
+            ).delete()
+            if deleted:
+                CustomUser.objects.filter(pk=user.pk).update(followers_count=F('followers_count') - 1)
+                CustomUser.objects.filter(pk=self.pk).update(following_count=F('following_count') - 1)
+        if deleted:
+            user_unfollowed.send(sender=CustomUser, follower=self, followed=user)
+        return bool(deleted)
@@ -0,0 +1,74 @@
+"""
+Password hashing off the request thread.
+
+PBKDF2 spends most of its time inside hashlib, which releases the GIL, so
+running it on a small thread pool lets several logins hash in parallel
+while the request threads stay free for cheap work. The pool is bounded:
+when ``LOGIN_HASHER_POOL_SIZE`` workers are busy and
+``LOGIN_HASHER_QUEUE_SIZE`` more jobs are waiting, new callers get a 503
+straight away instead of piling up behind a login burst.
+
+The caller still waits for its hash, so the pool does not make a single
+login any faster: it bounds how many hashes run at once and how many wait.
+
+Only hashing runs on the pool; database access stays on the calling
+thread so it keeps using the request's connection and transaction.
+Logins use it through ``accounts.backends.PooledPasswordBackend``.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+POOL_SIZE = getattr(settings, 'LOGIN_HASHER_POOL_SIZE', None) or os.cpu_count() or 1
+QUEUE_SIZE = getattr(settings, 'LOGIN_HASHER_QUEUE_SIZE', POOL_SIZE * 4)
+QUEUE_TIMEOUT = getattr(settings, 'LOGIN_HASHER_QUEUE_TIMEOUT', 0.5)
+
+_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='password-hasher')
+_slots = threading.BoundedSemaphore(POOL_SIZE + QUEUE_SIZE)
+
+
+class HasherBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, please try again shortly.'
+    default_code = 'hasher_busy'
+
+
+def run_in_pool(func, *args):
+    """Run ``func(*args)`` on the hasher pool and wait for its result"""
+    if not _slots.acquire(timeout=QUEUE_TIMEOUT):
+        raise HasherBusy()
+    try:
+        future = _executor.submit(func, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+
+def hash_password(password):
+    """make_password() on the hasher pool"""
+    return run_in_pool(make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded``.
+
+    Returns ``(valid, new_encoded)`` where ``new_encoded`` is a fresh hash
+    when the stored one was made with an outdated hasher or work factor,
+    mirroring the rehash AbstractBaseUser.check_password() does.
+    """
+    if not check_password(password, encoded):
+        return False, None
+
+    preferred = get_hasher('default')
+    hasher = identify_hasher(encoded)
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        return True, make_password(password, hasher=preferred)
+    return True, None
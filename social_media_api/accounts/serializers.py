@@ -1,10 +1,35 @@
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from jobs.queue import enqueue
+from .images import variant_urls
+from .passwords import hash_password
+from .tasks import PENDING_PICTURE_DIR, process_profile_picture
 
 UserModel = get_user_model()
 
 
+def queue_profile_picture(user, upload):
+    """
+    Stream an upload to storage and leave validation and thumbnails to a worker.
+
+    Both happen once the current transaction commits, so a rolled back
+    registration or update leaves neither a staged file nor a job behind.
+    """
+    def stage():
+        staged = default_storage.save(f'{PENDING_PICTURE_DIR}/{upload.name}', upload)
+        try:
+            enqueue(process_profile_picture, user_id=user.pk, path=staged)
+        except Exception:
+            default_storage.delete(staged)
+            raise
+
+    transaction.on_commit(stage)
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """serializer for creating new user accounts"""
 # serializers.CharField()
@@ -28,12 +53,22 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password_confirm')
         user_password = validated_data.pop('password')
+        profile_picture = validated_data.pop('profile_picture', None)
 
-        # get_user_model().objects.create_user
-        new_user = UserModel.objects.create_user(password=user_password, **validated_data)
+        # Same normalization as create_user(), but the password is hashed on
+        # the bounded hasher pool instead of the request thread
+        validated_data['username'] = UserModel.normalize_username(validated_data['username'])
+        validated_data['email'] = UserModel.objects.normalize_email(validated_data.get('email'))
+        new_user = UserModel(password=hash_password(user_password), **validated_data)
 
-        # Generate auth token for the new user
-        Token.objects.create(user=new_user)
+        with transaction.atomic():
+            new_user.save()
+
+            # Generate auth token for the new user; also cached on new_user.auth_token
+            Token.objects.create(user=new_user)
+
+            if profile_picture:
+                queue_profile_picture(new_user, profile_picture)
 
         return new_user
         
@@ -46,17 +81,27 @@ class UserLoginSerializer(serializers.Serializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """serializer for user profile data"""
 
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = UserModel
-        fields = ['id', 'username', 'email', 'bio', 'profile_picture'
-                  'followers_count', 'following_count']
-        read_only_fields = ['id', 'username']
-
-    def get_followers_count(self, obj):
-        return obj.get_followers_count()
-    
-    def get_following_cont(self, obj):
-        return obj.get_following_count()
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'bio', 'profile_picture',
+                  'profile_picture_variants', 'followers_count', 'following_count']
+        # The counters are denormalized columns maintained by follow/unfollow
+        read_only_fields = ['id', 'username', 'followers_count', 'following_count']
+
+    def get_profile_picture_variants(self, user):
+        """Thumbnail URLs by size and format, e.g. ``{"128": {"webp": ...}}``"""
+        request = self.context.get('request')
+        build_url = request.build_absolute_uri if request else None
+        return variant_urls(user.profile_thumbnails, build_url)
+
+    def update(self, instance, validated_data):
+        # A new picture replaces the current one once the worker has processed it
+        profile_picture = validated_data.pop('profile_picture', None)
+        if 'profile_picture' in self.initial_data and profile_picture is None:
+            validated_data.update(profile_picture=None, profile_thumbnails={})
+        instance = super().update(instance, validated_data)
+        if profile_picture:
+            queue_profile_picture(instance, profile_picture)
+        return instance
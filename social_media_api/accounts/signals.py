@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after a follow relationship is created or removed.
+# Arguments: ``follower`` (the user who follows) and ``followed``.
+user_followed = Signal()
+user_unfollowed = Signal()
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from PIL import Image, UnidentifiedImageError
+
+from jobs.queue import task
+from .images import render_thumbnails, store_original
+
+UserModel = get_user_model()
+
+PROFILE_PICTURE_DIR = 'profile_pics'
+# Uploads wait here, unvalidated, for process_profile_picture
+PENDING_PICTURE_DIR = f'{PROFILE_PICTURE_DIR}/pending'
+
+
+@task
+def process_profile_picture(user_id, path):
+    """
+    Validate a staged profile picture, store it and render its thumbnails.
+
+    Safe to run again: the staged file is removed once stored, and stored
+    files are content-addressed, so a repeat run finds nothing to do or
+    writes the same names.
+    """
+    if not default_storage.exists(path):
+        return
+    try:
+        with default_storage.open(path) as upload:
+            Image.open(upload).verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        # Not an image after all, or far too large: drop it rather than retrying
+        default_storage.delete(path)
+        return
+
+    original = store_original(path, PROFILE_PICTURE_DIR)
+    thumbnails = render_thumbnails(original, PROFILE_PICTURE_DIR)
+
+    # Files are content-addressed and may be shared, so nothing is deleted
+    # when the user is gone
+    UserModel.objects.filter(pk=user_id).update(
+        profile_picture=original, profile_thumbnails=thumbnails
+    )
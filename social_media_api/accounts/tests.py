@@ -1,3 +1,297 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APITransactionTestCase
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import run_pending
+
+from .authentication import token_cache
+from .serializers import UserProfileSerializer, queue_profile_picture
+from .tasks import process_profile_picture
+from .views import serve_media
+
+UserModel = get_user_model()
+
+
+class FollowTestCase(APITestCase):
+    def setUp(self):
+        self.alice = UserModel.objects.create_user(username="alice", email="alice@test.com", password="alicePass")
+        self.bob = UserModel.objects.create_user(username="bob", email="bob@test.com", password="bobPass")
+        self.client.force_authenticate(user=self.alice)
+
+    def test_follow_updates_counters(self):
+        response = self.client.post(reverse('follow-user', kwargs={'user_id': self.bob.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.following_count, self.bob.followers_count), (1, 1))
+        self.assertIn(self.alice, self.bob.followers.all())
+
+    def test_follow_twice_counts_once(self):
+        url = reverse('follow-user', kwargs={'user_id': self.bob.pk})
+        self.client.post(url)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.bob.refresh_from_db()
+        self.assertEqual(self.bob.followers_count, 1)
+
+    def test_cannot_follow_self(self):
+        response = self.client.post(reverse('follow-user', kwargs={'user_id': self.alice.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unfollow_updates_counters(self):
+        self.alice.follow(self.bob)
+        response = self.client.post(reverse('unfollow-user', kwargs={'user_id': self.bob.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.following_count, self.bob.followers_count), (0, 0))
+
+        response = self.client.post(reverse('unfollow-user', kwargs={'user_id': self.bob.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reconcile_command(self):
+        self.bob.followers.add(self.alice)  # bypasses the counters
+        call_command('reconcile_follow_counts', batch_size=1, stdout=StringIO())
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.following_count, self.bob.followers_count), (1, 1))
+
+    def test_profile_serializer_does_not_query_counts(self):
+        self.alice.follow(self.bob)
+        users = list(UserModel.objects.all())
+        with self.assertNumQueries(0):
+            data = UserProfileSerializer(users, many=True).data
+        counts = {user['username']: (user['followers_count'], user['following_count']) for user in data}
+        self.assertEqual(counts, {'alice': (0, 1), 'bob': (1, 0)})
+
+
+class CachingTokenAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = UserModel.objects.create_user(username="alice", email="alice@test.com", password="alicePass")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('user-profile')
+
+    def test_repeat_requests_skip_token_lookup(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['username'], "alice")
+
+    def test_deleted_token_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_follow_refreshes_cached_counters(self):
+        other = UserModel.objects.create_user(username="bob", email="bob@test.com", password="bobPass")
+        self.client.get(self.url)
+        self.user.follow(other)
+        self.assertEqual(self.client.get(self.url).json()['following_count'], 1)
+
+
+class UserLoginTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(username="alice", email="alice@test.com", password="alicePass")
+        self.url = reverse('user-login')
+
+    def test_login_returns_token(self):
+        response = self.client.post(self.url, {'username': "alice", 'password': "alicePass"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['token'], Token.objects.get(user=self.user).key)
+
+        # Second login reuses the token loaded together with the user
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {'username': "alice", 'password': "alicePass"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_credentials(self):
+        for username in ("alice", "nobody"):
+            response = self.client.post(self.url, {'username': username, 'password': "wrong"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_username_rate_limit(self):
+        for _ in range(5):
+            self.client.post(self.url, {'username': "alice", 'password': "wrong"}, format='json')
+        response = self.client.post(self.url, {'username': "alice", 'password': "alicePass"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+        # Failures from one address do not lock the user out elsewhere
+        response = self.client.post(
+            self.url, {'username': "alice", 'password': "alicePass"}, format='json', REMOTE_ADDR='10.0.0.2',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_non_object_body(self):
+        response = self.client.post(self.url, ["alice", "alicePass"], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_login_signal(self):
+        failures = []
+
+        def handler(sender, credentials, **kwargs):
+            failures.append(credentials['username'])
+
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+        self.client.post(self.url, {'username': "alice", 'password': "wrong"}, format='json')
+        self.assertEqual(failures, ["alice"])
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_outdated_hash_upgraded_on_login(self):
+        self.user.password = make_password("alicePass", hasher='md5')
+        self.user.save()
+        response = self.client.post(self.url, {'username': "alice", 'password': "alicePass"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+
+class UserRegistrationTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.url = reverse('user-register')
+
+    def payload(self, **extra):
+        return {
+            'username': "alice",
+            'email': "alice@test.com",
+            'password': "alicePass123",
+            'password_confirm': "alicePass123",
+            **extra,
+        }
+
+    def test_registration_query_count(self):
+        # Username uniqueness check, user and token inserts, and the
+        # savepoint pair around them
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, self.payload(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = UserModel.objects.get(username="alice")
+        self.assertEqual(response.json()['token'], Token.objects.get(user=user).key)
+        self.assertTrue(user.check_password("alicePass123"))
+
+
+class ProfilePictureTestCase(APITransactionTestCase):
+    # Pictures are staged once the transaction commits, so these tests need
+    # real commits rather than TestCase's wrapping transaction
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.url = reverse('user-register')
+
+    def payload(self, **extra):
+        return {
+            'username': "alice",
+            'email': "alice@test.com",
+            'password': "alicePass123",
+            'password_confirm': "alicePass123",
+            **extra,
+        }
+
+    def test_profile_picture_processed_in_background(self):
+        image = BytesIO()
+        Image.new('RGB', (32, 32), 'red').save(image, 'PNG')
+        upload = SimpleUploadedFile('avatar.png', image.getvalue(), content_type='image/png')
+
+        with self.settings(MEDIA_ROOT=self.media_root):
+            response = self.client.post(self.url, self.payload(profile_picture=upload), format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            user = UserModel.objects.get(username="alice")
+            self.assertFalse(user.profile_picture)
+            self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+
+            run_pending()
+
+        user.refresh_from_db()
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        # Stored under a content-hashed name, with every thumbnail variant
+        self.assertRegex(user.profile_picture.name, r'^profile_pics/[0-9a-f]{16}\.png$')
+        self.assertEqual(set(user.profile_thumbnails), {'64', '128', '512'})
+        self.assertEqual(set(user.profile_thumbnails['64']), {'webp', 'jpeg'})
+
+        with self.settings(MEDIA_ROOT=self.media_root):
+            with Image.open(f"{self.media_root}/{user.profile_thumbnails['128']['webp']}") as thumbnail:
+                self.assertEqual((thumbnail.format, thumbnail.size), ('WEBP', (128, 128)))
+
+            data = UserProfileSerializer(user).data
+            self.assertEqual(data['profile_picture_variants']['64']['jpeg'],
+                             '/media/' + user.profile_thumbnails['64']['jpeg'])
+
+            name = user.profile_thumbnails['512']['webp']
+            response = serve_media(RequestFactory().get(f'/media/{name}'), name)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('immutable', response['Cache-Control'])
+            response.close()
+
+            # Staged uploads are never served, whatever their name
+            with self.assertRaises(Http404):
+                serve_media(RequestFactory().get('/media/'), 'profile_pics/pending/0123456789abcdef.png')
+
+    def test_invalid_picture_dropped(self):
+        upload = SimpleUploadedFile('avatar.png', b'not an image', content_type='image/png')
+        self.client.force_authenticate(user=UserModel.objects.create_user(username="bob", password="bobPass123"))
+        with self.settings(MEDIA_ROOT=self.media_root):
+            response = self.client.patch(reverse('user-profile'), {'profile_picture': upload}, format='multipart')
+        # Rejected by ImageField validation before anything is queued
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_profile_update_queues_picture(self):
+        image = BytesIO()
+        Image.new('RGB', (600, 300), 'blue').save(image, 'JPEG')
+        upload = SimpleUploadedFile('avatar.jpg', image.getvalue(), content_type='image/jpeg')
+        user = UserModel.objects.create_user(username="bob", password="bobPass123")
+        self.client.force_authenticate(user=user)
+
+        with self.settings(MEDIA_ROOT=self.media_root):
+            response = self.client.patch(reverse('user-profile'), {'profile_picture': upload}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['profile_picture_variants'], {})
+            run_pending()
+            # Running the job again finds the staged file gone and does nothing
+            process_profile_picture(user.pk, Job.objects.get().payload['path'])
+
+        user.refresh_from_db()
+        self.assertRegex(user.profile_picture.name, r'^profile_pics/[0-9a-f]{16}\.jpg$')
+        self.assertEqual(len(user.profile_thumbnails), 3)
+
+    def test_rolled_back_upload_leaves_nothing_staged(self):
+        upload = SimpleUploadedFile('avatar.png', b'not checked yet', content_type='image/png')
+        user = UserModel.objects.create_user(username="bob", password="bobPass123")
+        with self.settings(MEDIA_ROOT=self.media_root):
+            with transaction.atomic():
+                queue_profile_picture(user, upload)
+                transaction.set_rollback(True)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(os.listdir(self.media_root), [])
@@ -0,0 +1,37 @@
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginIPRateThrottle(SimpleRateThrottle):
+    """Sliding-window limit on login attempts per client IP"""
+
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class LoginUsernameRateThrottle(SimpleRateThrottle):
+    """
+    Sliding-window limit on login attempts per username from one client IP.
+
+    Keyed on the IP as well, so nobody can lock a user out by failing
+    logins under their name from elsewhere.
+    """
+
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': f'{self.get_ident(request)}:{str(username).lower()}',
+        }
@@ -3,11 +3,15 @@ from django.urls import path
 from .views import (
     UserRegistrationView,
     UserProfileView,
-    UserLoginView
+    UserLoginView,
+    FollowUserView,
+    UnfollowUserView,
 )
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='user-register'),
     path('login/', UserLoginView.as_view(), name='user-login'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
+    path('follow/<int:user_id>/', FollowUserView.as_view(), name='follow-user'),
+    path('unfollow/<int:user_id>/', UnfollowUserView.as_view(), name='unfollow-user'),
 ]
\ No newline at end of file
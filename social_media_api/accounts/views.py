@@ -1,4 +1,7 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import render, get_object_or_404
+from django.views.static import serve
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -11,6 +14,9 @@ from  .serializers import (
     UserProfileSerializer,
     UserRegistrationSerializer,
 )
+from .images import is_hashed_name
+from .tasks import PENDING_PICTURE_DIR
+from .throttling import LoginIPRateThrottle, LoginUsernameRateThrottle
 
 UserModel = get_user_model()
 
@@ -26,7 +32,8 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        token = Token.objects.get(user=user)
+        # Created by the serializer and cached on the user, no extra query
+        token = user.auth_token
 
         response_data = {
             'user': {
@@ -44,6 +51,7 @@ class UserLoginView(APIView):
     """API endpoint for user authentication and token retrieval"""
     
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPRateThrottle, LoginUsernameRateThrottle]
 
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
@@ -52,7 +60,7 @@ class UserLoginView(APIView):
         username = serializer.validated_data['username']
         password = serializer.validated_data['password']
 
-        user = authenticate(username=username, password=password)
+        user = authenticate(request, username=username, password=password)
 
         if user is None:
             return Response(
@@ -60,7 +68,11 @@ class UserLoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        token, created = Token.objects.get_or_create(user=user)
+        # The token was loaded along with the user when it already exists
+        try:
+            token = user.auth_token
+        except Token.DoesNotExist:
+            token = Token.objects.create(user=user)
 
         return Response({
             'token': token.key,
@@ -75,4 +87,48 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+
+class FollowUserView(APIView):
+    """API endpoint for following another user"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, user_id):
+        target = get_object_or_404(UserModel, pk=user_id)
+        if target.pk == request.user.pk:
+            return Response(
+                {'error': 'You cannot follow yourself'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        created = request.user.follow(target)
+        return Response(
+            {'message': f'You are now following {target.username}' if created
+                        else f'You already follow {target.username}'},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+class UnfollowUserView(APIView):
+    """API endpoint for unfollowing a user"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, user_id):
+        target = get_object_or_404(UserModel, pk=user_id)
+
+        if not request.user.unfollow(target):
+            return Response(
+                {'error': f'You do not follow {target.username}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'message': f'You unfollowed {target.username}'})
+
+def serve_media(request, path):
+    """Serve processed profile pictures in development (DEBUG only)"""
+    # Unvalidated uploads are never served; processed files are content-hashed
+    if path.startswith(f'{PENDING_PICTURE_DIR}/') or not is_hashed_name(path):
+        raise Http404('Not a processed media file')
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    return response
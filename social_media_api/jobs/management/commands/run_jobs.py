@@ -0,0 +1,32 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import autodiscover, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per round')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        autodiscover()
+        worker_id = uuid.uuid4().hex
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker_id} started'))
+
+        total = 0
+        while True:
+            ran = run_pending(options['batch_size'], worker_id)
+            total += ran
+            if ran:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {total} jobs'))
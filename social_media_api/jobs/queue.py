@@ -0,0 +1,157 @@
+"""
+A small database-backed job queue.
+
+Tasks are plain functions registered with ``@task`` in an app's
+``tasks.py``; ``enqueue()`` stores a ``Job`` row with a JSON payload and
+the ``run_jobs`` management command claims and runs them. Claiming is a
+single conditional UPDATE, so several workers can share the table without
+running a job twice, on SQLite as well.
+
+While a job runs, a heartbeat thread keeps refreshing its ``locked_at``, so
+only jobs whose worker died are claimed again after ``LOCK_TIMEOUT``. A
+worker that still loses its lock (e.g. stalled for longer than that) no
+longer records the outcome. Since a job can still run more than once in
+that case, or after a crash, tasks must be idempotent.
+"""
+import logging
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Running jobs not finished after this long are assumed lost with their worker
+LOCK_TIMEOUT = timedelta(seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 300))
+
+_tasks = {}
+
+
+def task(func):
+    """Register ``func`` as a task that can be enqueued"""
+    name = f'{func.__module__}.{func.__name__}'
+    _tasks[name] = func
+    func.task_name = name
+    return func
+
+
+def autodiscover():
+    """Import every installed app's tasks module so its tasks get registered"""
+    autodiscover_modules('tasks')
+
+
+def enqueue(func, delay=None, max_attempts=3, **payload):
+    """Queue ``func(**payload)`` to run in a worker"""
+    return Job.objects.create(
+        name=func.task_name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def claim_jobs(limit, worker_id=None):
+    """Atomically mark up to ``limit`` due jobs as running for this worker"""
+    worker_id = worker_id or uuid.uuid4().hex
+    now = timezone.now()
+
+    Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - LOCK_TIMEOUT).update(
+        status=Job.PENDING, locked_by=''
+    )
+
+    due = list(
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    if not due:
+        return []
+
+    # Only rows still pending are taken, so concurrent workers never share a job
+    Job.objects.filter(id__in=due, status=Job.PENDING).update(
+        status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+    )
+    return list(Job.objects.filter(status=Job.RUNNING, locked_by=worker_id).order_by('run_after', 'id'))
+
+
+class Heartbeat(threading.Thread):
+    """Refresh a running job's lock every third of LOCK_TIMEOUT until stopped"""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def beat(self):
+        """Refresh the lock, returning False once another worker holds the job"""
+        return bool(
+            Job.objects.filter(pk=self.job.pk, status=Job.RUNNING, locked_by=self.job.locked_by)
+            .update(locked_at=timezone.now())
+        )
+
+    def run(self):
+        try:
+            while not self.stopped.wait(LOCK_TIMEOUT.total_seconds() / 3):
+                try:
+                    if not self.beat():
+                        break
+                except Exception:
+                    # A missed beat is retried; the lock is only lost after LOCK_TIMEOUT
+                    logger.exception('Heartbeat of job %s failed', self.job.pk)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def _finish(job, **fields):
+    # Only while this worker still holds the lock, so a run that was taken
+    # over does not overwrite the outcome of the newer one
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+        locked_by='', updated_at=timezone.now(), **fields
+    )
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome. Returns True on success."""
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        func = _tasks[job.name]
+        func(**job.payload)
+    except Exception:
+        heartbeat.stop()
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            # Exponential backoff: 2, 4, 8... seconds
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=2 ** job.attempts)
+        else:
+            job.status = Job.FAILED
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+        _finish(job, status=job.status, run_after=job.run_after, last_error=job.last_error)
+        return False
+
+    heartbeat.stop()
+    job.status = Job.DONE
+    if not _finish(job, status=job.status):
+        logger.warning('Job %s (%s) finished after its lock was taken over', job.pk, job.name)
+    return True
+
+
+def run_pending(limit=10, worker_id=None):
+    """Claim and run one batch of jobs. Returns the number of jobs run."""
+    jobs = claim_jobs(limit, worker_id)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import Heartbeat, claim_jobs, enqueue, run_job, run_pending, task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise RuntimeError("boom")
+
+
+class JobQueueTestCase(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_job_runs_once(self):
+        enqueue(record, value=42)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(calls, [42])
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_claimed_jobs_not_handed_out_twice(self):
+        enqueue(record, value=1)
+        self.assertEqual(len(claim_jobs(10, worker_id="a")), 1)
+        self.assertEqual(claim_jobs(10, worker_id="b"), [])
+
+    def test_failing_job_retried_then_failed(self):
+        enqueue(explode, max_attempts=2)
+        with self.assertLogs('jobs.queue', level='ERROR'):
+            run_pending()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn("boom", job.last_error)
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs('jobs.queue', level='ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_heartbeat_keeps_lock_until_taken_over(self):
+        enqueue(record, value=1)
+        job, = claim_jobs(10, worker_id="a")
+        Job.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertTrue(Heartbeat(job).beat())
+        # Refreshed, so not reclaimed as lost
+        self.assertEqual(claim_jobs(10, worker_id="b"), [])
+
+        Job.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        taken_over, = claim_jobs(10, worker_id="b")
+        self.assertFalse(Heartbeat(job).beat())
+
+        # The stale run no longer records its outcome over the new one
+        with self.assertLogs('jobs.queue', level='WARNING'):
+            run_job(job)
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+        run_job(taken_over)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
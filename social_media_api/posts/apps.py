@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PostsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'posts'
+
+    def ready(self):
+        # Connect the feed fan-out signal handlers
+        from . import feed  # noqa: F401
@@ -0,0 +1,172 @@
+"""
+Home feed: fan-out-on-write with a fan-out-on-read fallback.
+
+When a post is created its id is pushed into the ``FeedItem`` table of
+every follower, so reading a feed is a single indexed range scan.
+
+Accounts with more than ``FEED_FANOUT_THRESHOLD`` followers are not
+fanned out, since one post would mean that many inserts. Such posts are
+marked ``fanned_out=False`` and pulled from the ``Post`` table at read time
+for as long as they exist, whatever the author's follower count is later:
+an account crossing the threshold in either direction needs no backfill.
+
+Feeds are capped at ``FEED_MAX_LENGTH`` items lazily: writes only insert,
+and reading the first page of a feed deletes that user's items past the
+cap. ``trim_feeds`` does the same for every feed, for users who do not
+come back to read theirs.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Subquery
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from accounts.signals import user_followed, user_unfollowed
+from .models import Post, FeedItem
+
+UserModel = get_user_model()
+Follow = UserModel.followers.through
+
+FEED_MAX_LENGTH = getattr(settings, 'FEED_MAX_LENGTH', 500)
+FEED_FANOUT_THRESHOLD = getattr(settings, 'FEED_FANOUT_THRESHOLD', 1000)
+FANOUT_BATCH_SIZE = 1000
+
+
+def is_fanned_out(user):
+    """Whether posts by ``user`` are pushed to followers on write"""
+    return user.followers_count <= FEED_FANOUT_THRESHOLD
+
+
+def encode_cursor(created_at, post_id):
+    raw = f'{created_at.isoformat()}|{post_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, post_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({'cursor': 'Invalid cursor'})
+
+
+def push_to_feeds(user_ids, posts):
+    """Insert ``posts`` into the feeds of ``user_ids``"""
+    FeedItem.objects.bulk_create(
+        [
+            FeedItem(user_id=user_id, post_id=post.pk, created_at=post.created_at)
+            for user_id in user_ids
+            for post in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def trim_feed(user_id):
+    """Drop the items beyond FEED_MAX_LENGTH from one user's feed"""
+    items = FeedItem.objects.filter(user_id=user_id)
+    # The newest item past the cap, found by a seek on the feed index
+    cutoff = (
+        items.order_by('-created_at', '-post_id')
+        .values_list('created_at', 'post_id')[FEED_MAX_LENGTH:FEED_MAX_LENGTH + 1]
+    )
+    for created_at, post_id in cutoff:
+        items.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lte=post_id)).delete()
+
+
+def trim_feeds(batch_size=FANOUT_BATCH_SIZE):
+    """Trim every user's feed to FEED_MAX_LENGTH, returning the number of feeds visited"""
+    users = FeedItem.objects.values_list('user_id', flat=True).distinct().order_by('user_id')
+    visited = 0
+    last_id = 0
+    while batch := list(users.filter(user_id__gt=last_id)[:batch_size]):
+        for user_id in batch:
+            trim_feed(user_id)
+        visited += len(batch)
+        last_id = batch[-1]
+    return visited
+
+
+def fan_out_post(post):
+    """Push a new post to its author's feed and, if it is fanned out, to every follower"""
+    push_to_feeds([post.author_id], [post])
+    if not post.fanned_out:
+        return
+
+    followers = Follow.objects.filter(from_customuser_id=post.author_id).order_by('to_customuser_id')
+    last_id = 0
+    while True:
+        batch = list(
+            followers.filter(to_customuser_id__gt=last_id)
+            .values_list('to_customuser_id', flat=True)[:FANOUT_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        push_to_feeds(batch, [post])
+        last_id = batch[-1]
+
+
+def get_feed_page(user, cursor=None, page_size=20):
+    """
+    Return ``(posts, next_cursor)`` for one page of ``user``'s home feed.
+
+    Three queries: the pushed feed items, the followed accounts' posts that
+    were not fanned out, and the posts themselves with their authors. The
+    first page also trims the feed to FEED_MAX_LENGTH.
+    """
+    pushed = FeedItem.objects.filter(user=user)
+    followed = Follow.objects.filter(to_customuser=user).values('from_customuser_id')
+    pulled = Post.objects.filter(fanned_out=False, author__in=Subquery(followed))
+
+    if not cursor:
+        trim_feed(user.pk)
+    else:
+        created_at, post_id = decode_cursor(cursor)
+        pushed = pushed.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lt=post_id))
+        pulled = pulled.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+
+    keys = set(
+        pushed.order_by('-created_at', '-post_id')
+        .values_list('created_at', 'post_id')[:page_size + 1]
+    )
+    keys.update(
+        pulled.order_by('-created_at', '-id')
+        .values_list('created_at', 'id')[:page_size + 1]
+    )
+    keys = sorted(keys, reverse=True)
+
+    page_keys = keys[:page_size]
+    posts = Post.objects.select_related('author').in_bulk([post_id for _, post_id in page_keys])
+    next_cursor = encode_cursor(*page_keys[-1]) if len(keys) > page_size else None
+    return [posts[post_id] for _, post_id in page_keys if post_id in posts], next_cursor
+
+
+# Signal handlers keeping feeds in sync with posts and follows
+@receiver(pre_save, sender=Post)
+def decide_fan_out(sender, instance, **kwargs):
+    if instance._state.adding:
+        # Read the counter fresh: the author instance may predate recent follows
+        author = UserModel.objects.only('followers_count').get(pk=instance.author_id)
+        instance.fanned_out = is_fanned_out(author)
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        fan_out_post(instance)
+
+@receiver(user_followed)
+def backfill_feed_on_follow(sender, follower, followed, **kwargs):
+    # Posts that were not fanned out are pulled at read time anyway
+    recent = list(Post.objects.filter(author=followed, fanned_out=True)[:FEED_MAX_LENGTH])
+    if recent:
+        push_to_feeds([follower.pk], recent)
+
+@receiver(user_unfollowed)
+def clear_feed_on_unfollow(sender, follower, followed, **kwargs):
+    FeedItem.objects.filter(user=follower, post__author=followed).delete()
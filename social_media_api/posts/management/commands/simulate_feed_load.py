@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import feed
+from posts.models import Post
+
+UserModel = get_user_model()
+Follow = UserModel.followers.through
+
+
+class Command(BaseCommand):
+    help = 'Simulate a power-law follow graph and report feed write/read latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Number of simulated users')
+        parser.add_argument('--follows', type=int, default=30, help='Average accounts followed per user')
+        parser.add_argument('--alpha', type=float, default=1.1, help='Power-law exponent of follower counts')
+        parser.add_argument('--posts', type=int, default=2000, help='Posts to publish')
+        parser.add_argument('--reads', type=int, default=1000, help='Feed pages to read')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the simulated data never reaches the real database.
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            self.create_follows(rng, users, options['follows'], options['alpha'])
+
+            celebrities = UserModel.objects.filter(
+                pk__in=users, followers_count__gt=feed.FEED_FANOUT_THRESHOLD
+            ).count()
+            self.stdout.write(
+                f'{celebrities} accounts above the fan-out threshold '
+                f'({feed.FEED_FANOUT_THRESHOLD} followers) are read on demand'
+            )
+
+            authors = UserModel.objects.filter(pk__in=users)
+            authors = {user.pk: user for user in authors}
+            write_timings = []
+            for i in range(options['posts']):
+                author = authors[rng.choice(users)]
+                start = time.perf_counter()
+                Post.objects.create(author=author, title=f'Post {i}', content='Lorem ipsum')
+                write_timings.append((time.perf_counter() - start) * 1000)
+            self.report('post write', write_timings)
+
+            first_page, next_page = [], []
+            for _ in range(options['reads']):
+                reader = authors[rng.choice(users)]
+                start = time.perf_counter()
+                _, cursor = feed.get_feed_page(reader)
+                first_page.append((time.perf_counter() - start) * 1000)
+                if cursor:
+                    start = time.perf_counter()
+                    feed.get_feed_page(reader, cursor)
+                    next_page.append((time.perf_counter() - start) * 1000)
+            self.report('feed page 1', first_page)
+            self.report('feed page 2', next_page)
+
+            transaction.set_rollback(True)
+
+    def create_users(self, count):
+        self.stdout.write(f'Creating {count} users...')
+        UserModel.objects.bulk_create(
+            [UserModel(username=f'feed_load_{i}', password='!') for i in range(count)],
+            batch_size=1000,
+        )
+        return list(
+            UserModel.objects.filter(username__startswith='feed_load_')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_follows(self, rng, users, follows, alpha):
+        # Popularity follows a Zipf-like power law: the account at rank r
+        # is picked with weight 1 / r**alpha, so a few accounts get most follows.
+        weights = [1 / rank ** alpha for rank in range(1, len(users) + 1)]
+        popularity = users[:]
+        rng.shuffle(popularity)
+
+        rows = []
+        for user_id in users:
+            targets = set(rng.choices(popularity, weights=weights, k=follows)) - {user_id}
+            rows.extend(Follow(from_customuser_id=target, to_customuser_id=user_id) for target in targets)
+        self.stdout.write(f'Creating {len(rows)} follows...')
+        Follow.objects.bulk_create(rows, batch_size=5000, ignore_conflicts=True)
+        call_command('reconcile_follow_counts', stdout=StringIO())
+
+    def report(self, label, timings):
+        if len(timings) < 2:
+            self.stdout.write(f'{label:12} not enough samples')
+            return
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f'{label:12} n={len(timings):5}  p50: {percentiles[49]:7.2f} ms'
+            f'  p90: {percentiles[89]:7.2f} ms  p99: {percentiles[98]:7.2f} ms'
+            f'  max: {max(timings):7.2f} ms'
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.feed import FEED_MAX_LENGTH, trim_feeds
+
+
+class Command(BaseCommand):
+    help = 'Trim every home feed to FEED_MAX_LENGTH items, including feeds nobody has read lately'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of feeds to look up per query',
+        )
+
+    def handle(self, *args, **options):
+        visited = trim_feeds(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Trimmed {visited} feeds to {FEED_MAX_LENGTH} items'))
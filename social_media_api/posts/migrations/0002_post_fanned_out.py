@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_pulled_posts(apps, schema_editor):
+    # Posts by accounts above the threshold were never pushed to followers
+    Post = apps.get_model('posts', 'Post')
+    threshold = getattr(settings, 'FEED_FANOUT_THRESHOLD', 1000)
+    Post.objects.filter(author__followers_count__gt=threshold).update(fanned_out=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+        ('accounts', '0002_follow_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='fanned_out',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('fanned_out', False)), fields=['author', '-created_at', '-id'], name='post_pulled_idx'),
+        ),
+        migrations.RunPython(mark_pulled_posts, migrations.RunPython.noop),
+    ]
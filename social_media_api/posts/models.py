@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import models
+
+
+class Post(models.Model):
+    """A post published by a user"""
+
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='posts')
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Whether the post was pushed into followers' feeds when it was created;
+    # the others are merged in at read time (see posts.feed)
+    fanned_out = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Newest posts of an author, backfilled into a new follower's feed
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_created_idx'),
+            # Fan-out-on-read: newest posts of followed accounts that were not pushed
+            models.Index(
+                fields=['author', '-created_at', '-id'], condition=models.Q(fanned_out=False),
+                name='post_pulled_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class FeedItem(models.Model):
+    """
+    A post pushed into a follower's home feed (fan-out-on-write).
+
+    ``created_at`` is copied from the post so a feed page can be read from
+    this table alone, in (created_at, post) order.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='feed_items')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_items')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='unique_feed_item'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='feeditem_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} in feed of {self.user_id}' # type: ignore
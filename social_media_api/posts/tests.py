@@ -0,0 +1,112 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from . import feed
+from .models import Post, FeedItem
+
+UserModel = get_user_model()
+
+
+class FeedTestCase(APITestCase):
+    def setUp(self):
+        self.reader = UserModel.objects.create_user(username="reader", email="reader@test.com", password="readerPass")
+        self.writer = UserModel.objects.create_user(username="writer", email="writer@test.com", password="writerPass")
+        self.reader.follow(self.writer)
+        self.client.force_authenticate(user=self.reader)
+
+    def post(self, author, title):
+        return Post.objects.create(author=author, title=title, content="Body")
+
+    def feed_titles(self, **params):
+        response = self.client.get(reverse('feed'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.json()['results']]
+
+    def test_new_post_fanned_out_to_followers(self):
+        post = self.post(self.writer, "Hello")
+        self.assertTrue(FeedItem.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.feed_titles(), ["Hello"])
+
+    def test_feed_is_trimmed_on_read(self):
+        with mock.patch.object(feed, 'FEED_MAX_LENGTH', 3):
+            for i in range(5):
+                self.post(self.writer, f"Post {i}")
+            # Writes only insert
+            self.assertEqual(FeedItem.objects.filter(user=self.reader).count(), 5)
+            self.assertEqual(self.feed_titles(), ["Post 4", "Post 3", "Post 2"])
+        self.assertEqual(FeedItem.objects.filter(user=self.reader).count(), 3)
+
+    def test_trim_feeds_command(self):
+        with mock.patch.object(feed, 'FEED_MAX_LENGTH', 2):
+            for i in range(4):
+                self.post(self.writer, f"Post {i}")
+            call_command('trim_feeds', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(
+            sorted(FeedItem.objects.filter(user=self.reader).values_list('post__title', flat=True)),
+            ["Post 2", "Post 3"],
+        )
+        # The writer's own feed is trimmed as well
+        self.assertEqual(FeedItem.objects.filter(user=self.writer).count(), 2)
+
+    def test_high_follower_accounts_are_pulled_at_read_time(self):
+        celebrity = UserModel.objects.create_user(username="celebrity", email="celebrity@test.com", password="celebPass")
+        self.reader.follow(celebrity)
+        self.post(self.writer, "Pushed")
+        with mock.patch.object(feed, 'FEED_FANOUT_THRESHOLD', 0):
+            self.post(celebrity, "Pulled")
+            self.assertFalse(FeedItem.objects.filter(user=self.reader, post__author=celebrity).exists())
+            self.assertEqual(self.feed_titles(), ["Pulled", "Pushed"])
+
+    def test_posts_stay_in_feed_when_author_crosses_threshold(self):
+        with mock.patch.object(feed, 'FEED_FANOUT_THRESHOLD', 0):
+            self.post(self.writer, "While popular")
+        # Back below the threshold: later posts are pushed, the earlier one is still pulled
+        self.post(self.writer, "After")
+        self.assertEqual(self.feed_titles(), ["After", "While popular"])
+
+        with mock.patch.object(feed, 'FEED_FANOUT_THRESHOLD', 0):
+            # Posts pushed before the account crossed the threshold stay in the feed
+            self.assertEqual(self.feed_titles(), ["After", "While popular"])
+
+    def test_pagination_uses_fixed_number_of_queries(self):
+        for i in range(45):
+            self.post(self.writer, f"Post {i}")
+        titles = []
+        params = {}
+        while True:
+            # Three feed queries, plus the trim on the first page;
+            # authentication is forced so adds none
+            with self.assertNumQueries(3 if params else 4):
+                response = self.client.get(reverse('feed'), params)
+            data = response.json()
+            titles.extend(post['title'] for post in data['results'])
+            if not data['next']:
+                break
+            params = {'cursor': data['next'].split('cursor=')[1]}
+        self.assertEqual(titles, [f"Post {i}" for i in reversed(range(45))])
+
+    def test_follow_backfills_and_unfollow_clears_feed(self):
+        other = UserModel.objects.create_user(username="other", email="other@test.com", password="otherPass")
+        self.post(other, "Earlier post")
+        self.reader.follow(other)
+        self.assertEqual(self.feed_titles(), ["Earlier post"])
+        self.reader.unfollow(other)
+        self.assertEqual(self.feed_titles(), [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('feed'), {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_post_through_api(self):
+        self.client.force_authenticate(user=self.writer)
+        response = self.client.post(reverse('post-list'), {'title': "Via API", 'content': "Body"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['author'], "writer")
+        self.client.force_authenticate(user=self.reader)
+        self.assertEqual(self.feed_titles(), ["Via API"])
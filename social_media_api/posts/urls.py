@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import PostViewSet, FeedView
+
+router = DefaultRouter()
+router.register('posts', PostViewSet, basename='post')
+
+urlpatterns = [
+    path('feed/', FeedView.as_view(), name='feed'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,46 @@
+from rest_framework import viewsets, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .feed import get_feed_page
+from .models import Post
+from .serializers import PostSerializer
+
+
+class IsAuthorOrReadOnly(permissions.BasePermission):
+    """Only allow the author of a post to edit or delete it"""
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return obj.author == request.user
+
+
+class PostViewSet(viewsets.ModelViewSet):
+    """API endpoint for creating, viewing, editing and deleting posts"""
+
+    queryset = Post.objects.select_related('author')
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+
+class FeedView(APIView):
+    """API endpoint for the authenticated user's home feed"""
+
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 20
+
+    def get(self, request):
+        posts, next_cursor = get_feed_page(
+            request.user, request.query_params.get('cursor'), self.page_size
+        )
+        next_url = None
+        if next_cursor:
+            next_url = request.build_absolute_uri(f'{request.path}?cursor={next_cursor}')
+        return Response({
+            'next': next_url,
+            'results': PostSerializer(posts, many=True).data,
+        })
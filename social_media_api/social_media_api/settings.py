@@ -38,8 +38,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
 
     'accounts.apps.AccountsConfig',
+    'posts.apps.PostsConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
@@ -119,6 +122,20 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# User uploaded files (profile pictures)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+# Content-hashed media (profile pictures and thumbnails) never change. Used by the
+# DEBUG-only media view; the web server sets the same header in production
+# (deploy/nginx-media.conf)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Stream uploads to a temporary file on disk instead of holding them in memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Square profile picture thumbnails rendered by the background worker
+PROFILE_THUMBNAIL_SIZES = (64, 128, 512)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -127,9 +144,37 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Checks passwords on the hasher pool of accounts.passwords
+AUTHENTICATION_BACKENDS = ['accounts.backends.PooledPasswordBackend']
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachingTokenAuthentication',
     ],
+    # Sliding-window login limits, kept in the default cache. Use a cache
+    # shared between processes (e.g. Redis) when running several workers.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_username': '5/min',
+    },
+}
+
+# Password hashing pool used by the login endpoint (defaults to one thread per CPU)
+LOGIN_HASHER_POOL_SIZE = None
+# Logins allowed to wait for a hasher thread before new ones get a 503
+LOGIN_HASHER_QUEUE_SIZE = 32
+
+# Token -> user lookup cache used by CachingTokenAuthentication
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    # Set to a CACHES alias to share lookups between worker processes
+    'SHARED_CACHE': None,
 }
+
+# Home feed
+# Maximum number of items kept in each precomputed feed
+FEED_MAX_LENGTH = 500
+# Accounts with more followers than this are merged into feeds at read time
+FEED_FANOUT_THRESHOLD = 1000
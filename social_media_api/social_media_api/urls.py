@@ -14,10 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+
+from accounts.views import serve_media
 
 urlpatterns = [
     path('accounts/', include('accounts.urls')),
+    path('api/', include('posts.urls')),
     path('admin/', admin.site.urls),
 ]
+
+if settings.DEBUG:
+    # Development only; in production the web server serves media, see deploy/nginx-media.conf
+    urlpatterns += [
+        re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', serve_media, name='media'),
+    ]